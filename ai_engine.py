@@ -6,32 +6,72 @@ Gruha Alankara – AI / ML Engine
 Provides:
   • generate_design(image_path, style, room_type, dimensions)
       → Structured JSON design recommendations
+  • generate_designs_batch(items) / generate_design_async(...)
+      → Batched and awaitable variants of generate_design
   • DesignAI      – image analysis via HuggingFace pipeline
   • VoiceAgent    – LangChain conversational agent for multilingual Q&A
   • TTSEngine     – gTTS text-to-speech wrapper
+  • warmup()      – pre-build the above at startup (GRUHA_WARMUP=1)
 
 Architecture:
   • AI_USE_MOCK=true  → fast deterministic mock responses (dev/test)
   • AI_USE_MOCK=false → real HuggingFace + LangChain inference (production)
 """
 
+import asyncio
+import copy
+import hashlib
+import io
+import itertools
 import json
 import os
+import queue
 import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
 import time
 import uuid
 import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
 logger = logging.getLogger(__name__)
 
+
+def _intern_keys(value):
+    """Recursively rebuild dicts (inside dicts/lists) with interned string keys."""
+    if isinstance(value, dict):
+        return {sys.intern(k) if isinstance(k, str) else k: _intern_keys(v)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_intern_keys(v) for v in value]
+    return value
+
+
+def _freeze(table: dict, intern_values: bool = False) -> MappingProxyType:
+    """
+    Return a read-only view of a constant lookup table with interned keys,
+    so lookups hash once and compare by identity. intern_values additionally
+    interns str values (for small code tables like language aliases).
+    """
+    table = _intern_keys(table)
+    if intern_values:
+        table = {k: sys.intern(v) if isinstance(v, str) else v for k, v in table.items()}
+    return MappingProxyType(table)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # DESIGN AI ENGINE
 # ─────────────────────────────────────────────────────────────────────────────
 
 # Style-specific furniture and color knowledge base
-STYLE_KNOWLEDGE: dict[str, dict[str, Any]] = {
+STYLE_KNOWLEDGE: Mapping[str, dict[str, Any]] = _freeze({
     "Modern": {
         "furniture": [
             {"name": "Sectional Sofa",        "material": "Microfibre",     "color": "Slate Grey",    "price_inr": 45000,  "category": "Seating",   "placement": "against north wall"},
@@ -130,7 +170,7 @@ STYLE_KNOWLEDGE: dict[str, dict[str, Any]] = {
             "A central chowk (courtyard-like space) with a water feature anchors the space.",
         ],
     },
-}
+})
 
 # Default fallback style
 _DEFAULT_STYLE = "Modern"
@@ -141,9 +181,74 @@ def _get_style_data(style: str) -> dict:
     return STYLE_KNOWLEDGE.get(style, STYLE_KNOWLEDGE[_DEFAULT_STYLE])
 
 
+def _hex_to_rgb(hex_color: str) -> dict:
+    """Convert a hex color string to an RGB dict."""
+    h = hex_color.lstrip("#")
+    if len(h) != 6:
+        return {"r": 0, "g": 0, "b": 0}
+    v = int(h, 16)  # single parse, then mask out each channel
+    return {
+        "r": v >> 16,
+        "g": (v >> 8) & 0xFF,
+        "b": v & 0xFF,
+    }
+
+
+def _build_precomputed() -> MappingProxyType:
+    """
+    Derive the per-style artifacts that never change between requests
+    (furniture tuple, output templates, prices, colours with RGB, tips,
+    formatted tip) once at import.
+    """
+    tables = {}
+    for style, data in STYLE_KNOWLEDGE.items():
+        tips = tuple(data["tips"])
+        tables[style] = MappingProxyType({
+            "furniture_tuple": tuple(data["furniture"]),
+            # Output records with only id/priority left to fill per request
+            "furniture_templates": tuple(
+                MappingProxyType({
+                    "id":        None,
+                    "name":      f["name"],
+                    "category":  f["category"],
+                    "material":  f["material"],
+                    "color":     f["color"],
+                    "price_inr": f["price_inr"],
+                    "quantity":  1,
+                    "available": True,
+                    "placement": f["placement"],
+                    "priority":  None,
+                })
+                for f in data["furniture"]
+            ),
+            "prices": tuple(f["price_inr"] for f in data["furniture"]),
+            "colors_with_rgb": tuple(
+                MappingProxyType({
+                    "name":  c["name"],
+                    "hex":   c["hex"],
+                    "rgb":   MappingProxyType(_hex_to_rgb(c["hex"])),
+                    "usage": c["usage"],
+                })
+                for c in data["color_scheme"]
+            ),
+            "tips":     tips,
+            "tip0_fmt": f"For {style} style: {tips[0]}",
+        })
+    return MappingProxyType(tables)
+
+
+# Read-only so no caller can mutate a cached entry in place
+_PRECOMPUTED = _build_precomputed()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # MOCK GENERATOR  (fast, deterministic, no GPU required)
 # ─────────────────────────────────────────────────────────────────────────────
+def _mock_seed(image_path: str, style: str) -> int:
+    """RNG seed for _mock_generate; the design cache key includes it too."""
+    return len(image_path) + len(style)
+
+
 def _mock_generate(image_path: str, style: str,
                    room_type: str = "Living Room",
                    dimensions: dict | None = None) -> dict:
@@ -151,28 +256,25 @@ def _mock_generate(image_path: str, style: str,
     Simulate AI design generation without running real models.
     Returns the same structured JSON format as the real pipeline.
     """
-    random.seed(len(image_path) + len(style))  # Reproducible for same inputs
-    style_data = _get_style_data(style)
+    # Per-call RNG: reproducible for same inputs without touching the
+    # process-global random state shared by concurrent requests.
+    rng = random.Random(_mock_seed(image_path, style))
+    pre = _PRECOMPUTED.get(style, _PRECOMPUTED[_DEFAULT_STYLE])
 
     # Pick 3-4 furniture items from style knowledge
-    n_items = min(len(style_data["furniture"]), random.randint(3, 4))
-    furniture_picks = random.sample(style_data["furniture"], n_items)
+    n_items = min(len(pre["furniture_tuple"]), rng.randint(3, 4))
+    # Sampling indices draws exactly as sampling the items themselves would
+    pick_idx = rng.sample(range(len(pre["furniture_tuple"])), n_items)
 
-    # Build furniture list with full details
+    # Build furniture list from the precomputed templates
+    templates = pre["furniture_templates"]
+    id_prefix = f"FURN-{style[:3].upper()}-"
     furniture_output = []
-    for i, item in enumerate(furniture_picks, start=1):
-        furniture_output.append({
-            "id":          f"FURN-{style[:3].upper()}-{i:03d}",
-            "name":        item["name"],
-            "category":    item["category"],
-            "material":    item["material"],
-            "color":       item["color"],
-            "price_inr":   item["price_inr"],
-            "quantity":    1,
-            "available":   True,
-            "placement":   item["placement"],
-            "priority":    "recommended" if i == 1 else "optional",
-        })
+    for i, idx in enumerate(pick_idx, start=1):
+        item = dict(templates[idx])
+        item["id"] = f"{id_prefix}{i:03d}"
+        item["priority"] = "recommended" if i == 1 else "optional"
+        furniture_output.append(item)
 
     # Placement logic based on room dimensions
     room_area = None
@@ -193,65 +295,253 @@ def _mock_generate(image_path: str, style: str,
     placement_notes += [
         "Ensure at least 90 cm clearance between all walkways for comfortable circulation.",
         "Position seating to face the primary light source (window/natural light).",
-        f"For {style} style: {style_data['tips'][0]}",
+        pre["tip0_fmt"] if style in _PRECOMPUTED else f"For {style} style: {pre['tips'][0]}",
+    ]
+
+    # Draw every random value up front (same order as before, so seeded
+    # output is unchanged), then build the result in one literal.
+    confidence       = round(rng.uniform(0.78, 0.96), 3)
+    processing_ms    = rng.randint(800, 2400)
+    color_scheme     = [
+        {**c, "rgb": dict(c["rgb"]), "coverage_percent": round(rng.uniform(15, 45), 1)}
+        for c in pre["colors_with_rgb"]
     ]
+    light_score      = round(rng.uniform(5.5, 9.5), 1)
+    furniture_total  = sum(pre["prices"][idx] for idx in pick_idx)
+    labour_estimate  = rng.randint(15000, 45000)
+    miscellaneous    = rng.randint(5000, 15000)
 
-    result = {
+    return {
         "project_meta": {
             "style":       style,
             "room_type":   room_type,
             "room_area_sqft": room_area,
             "analysis_id": str(uuid.uuid4()),
-            "confidence":  round(random.uniform(0.78, 0.96), 3),
-            "processing_time_ms": random.randint(800, 2400),
+            "confidence":  confidence,
+            "processing_time_ms": processing_ms,
             "model":       "GruhaAI-Mock-v1.0",
         },
         "furniture": furniture_output,
-        "color_scheme": [
-            {
-                "name":     c["name"],
-                "hex":      c["hex"],
-                "rgb":      _hex_to_rgb(c["hex"]),
-                "usage":    c["usage"],
-                "coverage_percent": round(random.uniform(15, 45), 1),
-            }
-            for c in style_data["color_scheme"]
-        ],
+        "color_scheme": color_scheme,
         "placement": {
             "strategy":    "zone-based" if (room_area or 0) > 150 else "single-zone",
             "notes":       placement_notes,
             "traffic_flow": "U-shape" if style in ("Modern", "Minimalist") else "open-plan",
-            "natural_light_score": round(random.uniform(5.5, 9.5), 1),
+            "natural_light_score": light_score,
         },
-        "design_tips": style_data["tips"],
+        "design_tips": list(pre["tips"]),
         "estimated_budget_inr": {
-            "furniture_total": sum(f["price_inr"] for f in furniture_picks),
-            "labour_estimate": random.randint(15000, 45000),
-            "miscellaneous":   random.randint(5000, 15000),
+            "furniture_total": furniture_total,
+            "labour_estimate": labour_estimate,
+            "miscellaneous":   miscellaneous,
+            "grand_total":     furniture_total + labour_estimate + miscellaneous,
         },
     }
-    result["estimated_budget_inr"]["grand_total"] = sum(result["estimated_budget_inr"].values())
-    return result
-
-
-def _hex_to_rgb(hex_color: str) -> dict:
-    """Convert a hex color string to an RGB dict."""
-    h = hex_color.lstrip("#")
-    if len(h) != 6:
-        return {"r": 0, "g": 0, "b": 0}
-    return {
-        "r": int(h[0:2], 16),
-        "g": int(h[2:4], 16),
-        "b": int(h[4:6], 16),
-    }
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # REAL AI GENERATOR  (HuggingFace Vision + LLM reasoning)
 # ─────────────────────────────────────────────────────────────────────────────
+
+# BLIP pipeline singleton – loading the model costs seconds and gigabytes,
+# so it is built once per process and shared across requests.
+_BLIP_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+_BLIP_QUANTIZED = os.getenv("AI_QUANTIZED", "0") == "1"
+_BLIP_PIPELINE = None
+_BLIP_LOCK = threading.Lock()
+
+
+def _build_blip_pipeline():
+    """
+    Construct the BLIP pipeline. With AI_QUANTIZED=1 weights are int8:
+    bitsandbytes 8-bit loading on GPU, dynamic int8 Linear quantization on
+    CPU. Any quantization failure falls back to the full-precision model.
+    """
+    from transformers import pipeline
+
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    on_gpu = torch is not None and torch.cuda.is_available()
+
+    def _load(**kwargs):
+        logger.info("Loading BLIP image captioning model…")
+        return pipeline("image-to-text", model=_BLIP_MODEL_NAME, max_new_tokens=100, **kwargs)
+
+    if _BLIP_QUANTIZED and torch is not None:
+        try:
+            if on_gpu:
+                return _load(device_map="auto", model_kwargs={"load_in_8bit": True})
+            captioner = _load()
+            captioner.model = torch.quantization.quantize_dynamic(
+                captioner.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            return captioner
+        except Exception as e:
+            logger.warning("BLIP int8 quantization unavailable (%s); using full precision.", e)
+
+    if on_gpu:
+        return _load(torch_dtype=torch.float16, device_map="auto")
+    return _load()
+
+
+def _get_blip_pipeline():
+    """Return the shared BLIP captioning pipeline, building it on first use."""
+    global _BLIP_PIPELINE
+    if _BLIP_PIPELINE is None:
+        with _BLIP_LOCK:
+            if _BLIP_PIPELINE is None:  # double-checked: another thread may have won
+                _BLIP_PIPELINE = _build_blip_pipeline()
+    return _BLIP_PIPELINE
+
+
+# BLIP's processor resizes every input to 384×384 (bicubic)
+_BLIP_INPUT_SIZE = (384, 384)
+
+
+@dataclass(slots=True)
+class _DesignCtx:
+    """
+    Per-request design inputs. The upload is read and hashed exactly once
+    here; the cache key, the decode and both generators reuse these fields.
+    """
+    path: str
+    data: bytes
+    sha: str
+    style: str
+    room_type: str
+    dims: dict | None
+    img: Any = None  # decoded PIL image, filled on first use
+
+    @classmethod
+    def load(cls, path: str, style: str, room_type: str,
+             dims: dict | None) -> "_DesignCtx":
+        data = Path(path).read_bytes()
+        return cls(path, data, hashlib.sha256(data).hexdigest(), style, room_type, dims)
+
+    def image(self):
+        """Decoded RGB image at BLIP input size (shared across identical uploads)."""
+        if self.img is None:
+            self.img = _load_image(self)
+        return self.img
+
+
+# Decoded images keyed by content hash, so re-uploads of the same photo
+# (under any filename) skip decoding entirely.
+_IMAGE_CACHE_MAXSIZE = 256
+_image_cache: "OrderedDict[str, Any]" = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+
+def _decode_image(data: bytes):
+    """
+    Decode image bytes to RGB at BLIP's input resolution.
+
+    draft() lets libjpeg scale during the IDCT (a fraction of the work of a
+    full-size decode); the result is already model-sized, so the
+    processor's own resize becomes a no-op.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", _BLIP_INPUT_SIZE)
+        return img.convert("RGB").resize(_BLIP_INPUT_SIZE, Image.BICUBIC)
+
+
+def _load_image(ctx: _DesignCtx):
+    """Return the decoded image for ctx, reusing a cached decode of the same bytes."""
+    with _image_cache_lock:
+        img = _image_cache.get(ctx.sha)
+        if img is not None:
+            _image_cache.move_to_end(ctx.sha)
+            return img
+    img = _decode_image(ctx.data)
+    with _image_cache_lock:
+        _image_cache[ctx.sha] = img
+        while len(_image_cache) > _IMAGE_CACHE_MAXSIZE:
+            _image_cache.popitem(last=False)
+    return img
+
+
+def _caption_images(images: list) -> list[str]:
+    """Caption several images with a single batched BLIP forward pass."""
+    captioner = _get_blip_pipeline()
+    outputs = captioner(images, batch_size=len(images))
+    return [out[0]["generated_text"] if out else "a room interior" for out in outputs]
+
+
+# Micro-batching: concurrent requests arriving within the window share one
+# forward pass instead of each launching its own.
+_BATCH_WINDOW_S = float(os.getenv("AI_BATCH_WINDOW_MS", "20")) / 1000
+_MAX_BATCH = 8
+# Upper bound on how long a request waits for its caption before falling back
+# to the mock pipeline (covers a wedged or crashed batcher thread).
+_CAPTION_TIMEOUT_S = float(os.getenv("AI_CAPTION_TIMEOUT_S", "60"))
+
+
+class _CaptionBatcher:
+    """Collects caption requests from many threads and runs them in batches."""
+
+    def __init__(self, window_s: float = _BATCH_WINDOW_S, max_batch: int = _MAX_BATCH):
+        self._queue: queue.Queue = queue.Queue()
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, image) -> Future:
+        """Queue an image for captioning; the Future resolves to its caption."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((image, future))
+        return future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="blip-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window_s
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                captions = _caption_images([image for image, _ in batch])
+            except BaseException as e:  # propagate to every waiting caller
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), caption in zip(batch, captions):
+                future.set_result(caption)
+            if len(captions) != len(batch):
+                # Never leave a caller waiting on a future nobody will resolve
+                error = RuntimeError(
+                    f"captioner returned {len(captions)} captions for {len(batch)} images"
+                )
+                for _, future in batch[len(captions):]:
+                    future.set_exception(error)
+
+
+_caption_batcher = _CaptionBatcher()
+
+
 def _real_generate(image_path: str, style: str,
                    room_type: str = "Living Room",
-                   dimensions: dict | None = None) -> dict:
+                   dimensions: dict | None = None,
+                   ctx: _DesignCtx | None = None) -> dict:
     """
     Real AI pipeline using HuggingFace transformers.
 
@@ -259,24 +549,18 @@ def _real_generate(image_path: str, style: str,
     Step 2: Use caption + style to select appropriate furniture & colours
     Step 3: Assemble structured JSON response (same format as mock)
 
+    Pass ctx (from generate_design) to reuse the already-read image bytes.
+
     Note: This requires a machine with sufficient RAM/VRAM.
     Falls back to mock on ImportError or model errors.
     """
     try:
-        from transformers import pipeline
-        from PIL import Image
-
-        logger.info("Loading BLIP image captioning model…")
-        captioner = pipeline(
-            "image-to-text",
-            model="Salesforce/blip-image-captioning-base",
-            max_new_tokens=100,
-        )
-
-        image = Image.open(image_path).convert("RGB")
-        caption_result = captioner(image)
-        caption = caption_result[0]["generated_text"] if caption_result else "a room interior"
-        logger.info("Image caption: %s", caption)
+        if ctx is None:
+            ctx = _DesignCtx.load(image_path, style, room_type, dimensions)
+        image = ctx.image()
+        caption = _caption_batcher.submit(image).result(timeout=_CAPTION_TIMEOUT_S)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Image caption: %s", caption)
 
         # Use caption + style to build context-aware recommendations
         # In production: pipe caption into an LLM (GPT-4, Mistral, etc.)
@@ -294,9 +578,125 @@ def _real_generate(image_path: str, style: str,
         return _mock_generate(image_path, style, room_type, dimensions)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# RESPONSE CACHE  (exact match on image content + request parameters)
+# ─────────────────────────────────────────────────────────────────────────────
+# Two tiers: a per-process LRU, backed by Redis (when REDIS_URL is set) so a
+# result computed by one worker is reused by every worker for a week.
+_DESIGN_CACHE_MAXSIZE = 1024
+_DESIGN_CACHE_TTL_S   = 7 * 24 * 3600
+_design_cache: "OrderedDict[str, tuple[int, dict]]" = OrderedDict()
+_design_cache_lock = threading.Lock()
+
+_design_redis = None
+_design_redis_lock = threading.Lock()
+
+
+def _get_design_redis():
+    """Shared Redis client for the design cache, or None when not configured."""
+    global _design_redis
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    if _design_redis is None:
+        with _design_redis_lock:
+            if _design_redis is None:
+                try:
+                    import redis
+                except ImportError:
+                    return None
+                _design_redis = redis.Redis.from_url(url, socket_timeout=0.25)
+    return _design_redis
+
+
+def _design_cache_key(ctx: _DesignCtx, use_mock: bool) -> str:
+    # Both pipelines draw their numbers from the mock RNG, whose seed comes
+    # from the path and style rather than the image bytes, so it is part of
+    # the key: a hit must equal what a fresh run would have returned.
+    dims = "x".join(f"{k}={v}" for k, v in sorted(ctx.dims.items())) if ctx.dims else "-"
+    mode = "mock" if use_mock else "real"
+    seed = _mock_seed(ctx.path, ctx.style)
+    return f"ai:design:{ctx.sha}:{ctx.style}:{ctx.room_type}:{dims}:{mode}:{seed}"
+
+
+def _design_cache_get(key: str) -> dict | None:
+    """
+    Return a private copy of a cached design with a fresh analysis_id and
+    project_meta.from_cache set to the epoch second it was computed.
+    """
+    with _design_cache_lock:
+        entry = _design_cache.get(key)
+        if entry is not None:
+            _design_cache.move_to_end(key)
+
+    if entry is None:
+        client = _get_design_redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+            if raw is None:
+                return None
+            stored = json.loads(raw)
+            entry = (int(stored["cached_at"]), stored["result"])
+            if not isinstance(entry[1].get("project_meta"), dict):
+                raise ValueError("cached design has no project_meta")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Corrupt or foreign value under our key: treat as a miss
+            logger.warning("Ignoring unreadable design cache entry %s: %s", key, e)
+            return None
+        except Exception as e:   # cache outage must never fail a request
+            logger.warning("Design cache read failed: %s", e)
+            return None
+        _design_cache_store(key, entry)
+
+    cached_at, cached = entry
+    result = copy.deepcopy(cached)
+    result["project_meta"]["analysis_id"] = str(uuid.uuid4())
+    result["project_meta"]["from_cache"] = cached_at
+    return result
+
+
+def _design_cache_store(key: str, entry: tuple[int, dict]) -> None:
+    with _design_cache_lock:
+        _design_cache[key] = entry
+        _design_cache.move_to_end(key)
+        while len(_design_cache) > _DESIGN_CACHE_MAXSIZE:
+            _design_cache.popitem(last=False)
+
+
+def _design_cache_put(key: str, result: dict) -> None:
+    entry = (int(time.time()), copy.deepcopy(result))
+    _design_cache_store(key, entry)
+    client = _get_design_redis()
+    if client is not None:
+        try:
+            payload = json.dumps({"cached_at": entry[0], "result": entry[1]})
+            client.setex(key, _DESIGN_CACHE_TTL_S, payload)
+        except Exception as e:
+            logger.warning("Design cache write failed: %s", e)
+
+
+def clear_design_cache() -> None:
+    """Drop every design cached in this process (e.g. after the knowledge base changes)."""
+    with _design_cache_lock:
+        _design_cache.clear()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PUBLIC INTERFACE
 # ─────────────────────────────────────────────────────────────────────────────
+def _resolve_use_mock(use_mock: bool | None) -> bool:
+    """Fall back to the AI_USE_MOCK config value when no override is given."""
+    if use_mock is not None:
+        return use_mock
+    try:
+        from flask import current_app
+        return current_app.config.get("AI_USE_MOCK", True)
+    except RuntimeError:
+        return True  # Outside app context
+
+
 def generate_design(
     image_path: str,
     style: str = "Modern",
@@ -330,34 +730,85 @@ def generate_design(
         logger.warning("Unknown style '%s', defaulting to Modern.", style)
         style = _DEFAULT_STYLE
 
-    # Resolve mock flag
-    if use_mock is None:
-        try:
-            from flask import current_app
-            use_mock = current_app.config.get("AI_USE_MOCK", True)
-        except RuntimeError:
-            use_mock = True  # Outside app context
+    use_mock = _resolve_use_mock(use_mock)
+
+    # Checked once: skips formatting/call overhead of the per-request INFO logs
+    log_info = logger.isEnabledFor(logging.INFO)
 
     start = time.perf_counter()
-    if use_mock:
-        logger.info("[AI] Using mock pipeline for style=%s", style)
+    ctx = _DesignCtx.load(image_path, style, room_type, dimensions)
+    cache_key = _design_cache_key(ctx, use_mock)
+    result = _design_cache_get(cache_key)
+    if result is not None:
+        if log_info:
+            logger.info("[AI] Cache hit for style=%s", style)
+    elif use_mock:
+        if log_info:
+            logger.info("[AI] Using mock pipeline for style=%s", style)
         result = _mock_generate(image_path, style, room_type, dimensions)
+        _design_cache_put(cache_key, result)
     else:
-        logger.info("[AI] Using real HuggingFace pipeline for style=%s", style)
-        result = _real_generate(image_path, style, room_type, dimensions)
-
+        if log_info:
+            logger.info("[AI] Using real HuggingFace pipeline for style=%s", style)
+        result = _real_generate(image_path, style, room_type, dimensions, ctx=ctx)
+        # Don't pin a mock fallback (transient model error) into the cache
+        if result["project_meta"].get("model") != "GruhaAI-Mock-v1.0":
+            _design_cache_put(cache_key, result)
+
+    # Same schema on hits and misses: from_cache is None for a fresh result
+    result["project_meta"].setdefault("from_cache", None)
     elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
     result["project_meta"]["wall_clock_ms"] = elapsed_ms
-    logger.info("[AI] Design generated in %.1f ms", elapsed_ms)
+    if log_info:
+        logger.info("[AI] Design generated in %.1f ms", elapsed_ms)
     return result
 
 
+def generate_designs_batch(items: list[dict], use_mock: bool | None = None) -> list[dict]:
+    """
+    Generate designs for several images at once.
+
+    Each item is a dict of generate_design keyword arguments (image_path
+    required; style, room_type, dimensions optional). Items run concurrently
+    so their BLIP captions are grouped into shared forward passes.
+
+    Returns:
+        Results in the same order as items.
+
+    Raises:
+        FileNotFoundError: If any image_path does not exist.
+    """
+    if not items:
+        return []
+    use_mock = _resolve_use_mock(use_mock)
+    with ThreadPoolExecutor(max_workers=min(len(items), _MAX_BATCH)) as pool:
+        futures = [
+            pool.submit(generate_design, **{**item, "use_mock": use_mock})
+            for item in items
+        ]
+        return [f.result() for f in futures]
+
+
+async def generate_design_async(
+    image_path: str,
+    style: str = "Modern",
+    room_type: str = "Living Room",
+    dimensions: dict | None = None,
+    use_mock: bool | None = None,
+) -> dict:
+    """Awaitable generate_design for `async def` route handlers."""
+    use_mock = _resolve_use_mock(use_mock)  # needs the caller's app context
+    return await asyncio.to_thread(
+        generate_design, image_path, style, room_type, dimensions, use_mock
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # VOICE / LANGCHAIN AGENT
 # ─────────────────────────────────────────────────────────────────────────────
 
 # Interior design knowledge base for LangChain tool
-DESIGN_FAQ: dict[str, str] = {
+DESIGN_FAQ: Mapping[str, str] = _freeze({
     "vastu":         "Vastu Shastra recommends placing the main entrance facing north or east for positive energy. The master bedroom should be in the south-west.",
     "color living":  "For living rooms, warm neutrals like ivory and beige create welcoming spaces. Accent with teal or gold for an Indian-modern aesthetic.",
     "small room":    "For small rooms: use mirrors, multifunctional furniture, vertical storage, and light colours to create an illusion of space.",
@@ -365,7 +816,69 @@ DESIGN_FAQ: dict[str, str] = {
     "kitchen":       "For modular kitchens, the work triangle (fridge-hob-sink) should be under 7 metres total. Light wood or white laminates keep it bright.",
     "budget":        "A 2BHK full interior in India typically costs ₹5–15 lakhs depending on quality. Modular furniture reduces cost vs. custom carpentry.",
     "plants":        "Indoor plants like Monstera, Peace Lily, and Snake Plant improve air quality and add biophilic beauty to any Indian home.",
+})
+
+# Single-pass keyword matcher over all FAQ keys. The lookahead reports a match
+# at every position (overlaps included); ties go to the earlier FAQ entry, so
+# the result equals scanning DESIGN_FAQ in order.
+_FAQ_RE = re.compile("(?=(" + "|".join(map(re.escape, DESIGN_FAQ)) + "))")
+_FAQ_RANK = {keyword: rank for rank, keyword in enumerate(DESIGN_FAQ)}
+_FAQ_ANSWERS = tuple(DESIGN_FAQ.values())
+
+
+def _match_faq(query_lower: str) -> str | None:
+    """Return the answer for the highest-priority FAQ keyword in the query."""
+    best = None
+    for m in _FAQ_RE.finditer(query_lower):
+        rank = _FAQ_RANK[m.group(1)]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return None if best is None else _FAQ_ANSWERS[best]
+
+
+_FALLBACK_ANSWERS = {
+    "colour": ("Warm neutrals like ivory, beige, and warm white work well for most Indian homes. "
+               "Add character with a single accent wall in teal, terracotta, or deep blue."),
+    "furniture": ("When selecting furniture, consider the room's proportion first. "
+                  "In India, teak and sheesham are durable choices; for modern looks, "
+                  "engineered wood with laminates is cost-effective and attractive."),
+    "lighting": ("Layer your lighting: ambient (ceiling), task (work areas), and accent "
+                 "(decorative). Warm white LEDs (2700–3000K) suit living and bedrooms; "
+                 "cool white (4000K) suits kitchens and offices."),
 }
+_FALLBACK_DEFAULT = ("Thank you for your question! Gruha Alankara's AI specialises in interior design. "
+                     "Please ask about furniture selection, colour schemes, Vastu guidelines, "
+                     "or room layout suggestions.")
+# Group order is priority order (colour > furniture > lighting)
+_FALLBACK_RE = re.compile(
+    r"(?=(?P<colour>color|colour|paint)"
+    r"|(?P<furniture>furniture|sofa|bed|chair)"
+    r"|(?P<lighting>light|lamp|brightness))"
+)
+_FALLBACK_RANK = {group: rank for rank, group in enumerate(_FALLBACK_ANSWERS)}
+_FALLBACK_TEXTS = tuple(_FALLBACK_ANSWERS.values())
+
+
+# Canned replies the voice chain cycles through (no LLM provider is called)
+_CANNED_LLM_RESPONSES = (
+    "Based on Vastu Shastra and modern design principles, I recommend...",
+    "For your room, I suggest a warm colour palette with natural materials...",
+    "A great starting point is to identify your focal wall and build outward...",
+)
+
+
+class _MinimalChain:
+    """Round-robin canned responses behind the chain `predict` interface."""
+
+    __slots__ = ("_responses",)
+
+    def __init__(self, responses):
+        self._responses = itertools.cycle(responses)
+
+    def predict(self, input: str) -> str:
+        return next(self._responses)
 
 
 class VoiceAgent:
@@ -385,28 +898,16 @@ class VoiceAgent:
         self._chain = None
 
     def _build_chain(self):
-        """Lazily build the LangChain conversation chain."""
-        if self._chain:
-            return self._chain
-        try:
-            from langchain.chains import ConversationChain
-            from langchain.memory import ConversationBufferMemory
-            from langchain_community.llms import FakeListLLM
-
-            # FakeListLLM: production replacement = ChatOpenAI / HuggingFacePipeline
-            llm = FakeListLLM(
-                responses=[
-                    "Based on Vastu Shastra and modern design principles, I recommend...",
-                    "For your room, I suggest a warm colour palette with natural materials...",
-                    "A great starting point is to identify your focal wall and build outward...",
-                ]
-            )
-            memory = ConversationBufferMemory()
-            self._chain = ConversationChain(llm=llm, memory=memory, verbose=False)
-            logger.info("LangChain ConversationChain initialised.")
-        except Exception as e:
-            logger.warning("LangChain not available: %s", e)
-            self._chain = None
+        """
+        Lazily build the conversation chain.
+
+        The chain is a _MinimalChain cycling the canned responses (what
+        FakeListLLM + ConversationChain returned, minus the callback/prompt/
+        memory overhead). No LLM provider is called, whatever the environment
+        holds; a real model would replace the canned list here.
+        """
+        if self._chain is None:
+            self._chain = _MinimalChain(_CANNED_LLM_RESPONSES)
         return self._chain
 
     def answer(self, query: str, language: str = "en") -> str:
@@ -420,14 +921,19 @@ class VoiceAgent:
         Returns:
             Answer string in the requested language.
         """
+        query = query.strip()
+
+        # Very short queries always get the language-appropriate greeting, so
+        # answer them before doing any FAQ / LangChain work. maxsplit=2 keeps
+        # the word count exact without splitting the whole string.
+        if len(query.split(maxsplit=2)) <= 2:
+            return self.LANG_GREETINGS.get(language, self.LANG_GREETINGS["en"])
+
         query_lower = query.lower()
 
         # Try rule-based knowledge base first (fast, no API call needed)
-        for keyword, answer in DESIGN_FAQ.items():
-            if keyword in query_lower:
-                response = answer
-                break
-        else:
+        response = _match_faq(query_lower)
+        if response is None:
             # Try LangChain
             chain = self._build_chain()
             if chain:
@@ -439,29 +945,19 @@ class VoiceAgent:
             else:
                 response = self._fallback_answer(query_lower)
 
-        # Prefix with language-appropriate greeting if very short query
-        if len(query.strip().split()) <= 2:
-            response = self.LANG_GREETINGS.get(language, self.LANG_GREETINGS["en"])
-
         return response
 
     @staticmethod
     def _fallback_answer(query: str) -> str:
         """Rule-based fallback when AI chain is unavailable."""
-        if any(w in query for w in ("color", "colour", "paint")):
-            return ("Warm neutrals like ivory, beige, and warm white work well for most Indian homes. "
-                    "Add character with a single accent wall in teal, terracotta, or deep blue.")
-        if any(w in query for w in ("furniture", "sofa", "bed", "chair")):
-            return ("When selecting furniture, consider the room's proportion first. "
-                    "In India, teak and sheesham are durable choices; for modern looks, "
-                    "engineered wood with laminates is cost-effective and attractive.")
-        if any(w in query for w in ("light", "lamp", "brightness")):
-            return ("Layer your lighting: ambient (ceiling), task (work areas), and accent "
-                    "(decorative). Warm white LEDs (2700–3000K) suit living and bedrooms; "
-                    "cool white (4000K) suits kitchens and offices.")
-        return ("Thank you for your question! Gruha Alankara's AI specialises in interior design. "
-                "Please ask about furniture selection, colour schemes, Vastu guidelines, "
-                "or room layout suggestions.")
+        best = None
+        for m in _FALLBACK_RE.finditer(query):
+            rank = _FALLBACK_RANK[m.lastgroup]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return _FALLBACK_DEFAULT if best is None else _FALLBACK_TEXTS[best]
 
 
 # Singleton instance
@@ -482,14 +978,67 @@ def get_voice_agent() -> VoiceAgent:
 class TTSEngine:
     """gTTS wrapper for multilingual text-to-speech conversion."""
 
-    SUPPORTED_LANGS = {
+    SUPPORTED_LANGS = _freeze({
         "en": "en",
         "hi": "hi",
         "te": "te",
         "english": "en",
         "hindi":   "hi",
         "telugu":  "te",
-    }
+    }, intern_values=True)
+
+    CACHE_SUBDIR = "cache"
+
+    def cache_key(self, text: str, language: str = "en") -> str:
+        """Content hash naming the rendered file for (language, text)."""
+        lang_code = self.SUPPORTED_LANGS.get(language.lower(), "en")
+        return hashlib.sha1(f"{lang_code}|{text}".encode("utf-8")).hexdigest()
+
+    def render(self, text: str, language: str = "en", cache_dir: str = "/tmp") -> str:
+        """
+        Render text into the content-addressed store ``cache_dir/<cache_key>.mp3``.
+
+        Identical (language, text) pairs are only ever sent to Google once per
+        cache_dir; later calls return the existing file.
+
+        Args:
+            text:      Text to synthesize.
+            language:  Language code or name.
+            cache_dir: Directory holding the content-addressed files.
+
+        Returns:
+            Absolute path to the MP3 (or the ``.txt`` placeholder written
+            when gTTS is not installed).
+
+        Raises:
+            RuntimeError: If gTTS fails.
+        """
+        lang_code  = self.SUPPORTED_LANGS.get(language.lower(), "en")
+        cache_path = os.path.join(cache_dir, self.cache_key(text, lang_code) + ".mp3")
+
+        if os.path.isfile(cache_path):
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("TTS cache hit: %s (lang=%s)", cache_path, lang_code)
+            return cache_path
+
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            from gtts import gTTS
+            tts = gTTS(text=text, lang=lang_code, slow=False)
+            tmp_path = f"{cache_path}.{uuid.uuid4().hex[:8]}.tmp"
+            tts.save(tmp_path)
+            os.replace(tmp_path, cache_path)  # atomic: readers never see a partial file
+            if logger.isEnabledFor(logging.INFO):  # also skips the eager len(text)
+                logger.info("TTS saved: %s (lang=%s, len=%d chars)", cache_path, lang_code, len(text))
+            return cache_path
+        except ImportError:
+            logger.warning("gTTS not installed — writing placeholder TXT file.")
+            txt_path = cache_path[:-len(".mp3")] + ".txt"
+            Path(txt_path).write_text(f"[TTS placeholder] lang={lang_code}\n{text}")
+            return txt_path
+        except Exception as e:
+            logger.error("gTTS error: %s", e, exc_info=True)
+            raise RuntimeError(f"Text-to-speech synthesis failed: {e}") from e
 
     def synthesize(
         self,
@@ -501,6 +1050,9 @@ class TTSEngine:
         """
         Convert text to speech and save as MP3.
 
+        The audio is rendered once into ``output_dir/cache/`` (see render())
+        and linked under the requested name.
+
         Args:
             text:       Text to synthesize.
             language:   Language code or name.
@@ -513,26 +1065,56 @@ class TTSEngine:
         Raises:
             RuntimeError: If gTTS fails.
         """
-        lang_code = self.SUPPORTED_LANGS.get(language.lower(), "en")
-        fname     = (filename or f"tts_{uuid.uuid4().hex[:12]}") + ".mp3"
-        out_path  = os.path.join(output_dir, fname)
+        fname    = filename or f"tts_{uuid.uuid4().hex[:12]}"
+        rendered = self.render(text, language, os.path.join(output_dir, self.CACHE_SUBDIR))
+        out_path = os.path.join(output_dir, fname + os.path.splitext(rendered)[1])
+        _link_or_copy(rendered, out_path)
+        return out_path
 
-        os.makedirs(output_dir, exist_ok=True)
+    def synthesize_async(self, *args, **kwargs) -> Future:
+        """
+        Run synthesize() on a background thread so the caller is not blocked
+        on the gTTS network round-trip. Accepts the same arguments.
+
+        Returns:
+            Future resolving to the saved file path.
+        """
+        return _get_tts_executor().submit(self.synthesize, *args, **kwargs)
+
+    def render_async(self, *args, **kwargs) -> Future:
+        """render() on the background TTS pool; same arguments as render()."""
+        return _get_tts_executor().submit(self.render, *args, **kwargs)
 
-        try:
-            from gtts import gTTS
-            tts = gTTS(text=text, lang=lang_code, slow=False)
-            tts.save(out_path)
-            logger.info("TTS saved: %s (lang=%s, len=%d chars)", out_path, lang_code, len(text))
-            return out_path
-        except ImportError:
-            logger.warning("gTTS not installed — writing placeholder TXT file.")
-            txt_path = out_path.replace(".mp3", ".txt")
-            Path(txt_path).write_text(f"[TTS placeholder] lang={lang_code}\n{text}")
-            return txt_path
-        except Exception as e:
-            logger.error("gTTS error: %s", e, exc_info=True)
-            raise RuntimeError(f"Text-to-speech synthesis failed: {e}") from e
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Hard-link src to dst (replacing dst), copying when linking is unsupported.
+    Either way dst appears atomically, so a reader polling for it never sees
+    a partial file.
+    """
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+_TTS_MAX_WORKERS = int(os.getenv("TTS_CONCURRENCY", "4"))
+_tts_executor: ThreadPoolExecutor | None = None
+_tts_executor_lock = threading.Lock()
+
+
+def _get_tts_executor() -> ThreadPoolExecutor:
+    """Return the shared TTS worker pool, creating it on first use."""
+    global _tts_executor
+    if _tts_executor is None:
+        with _tts_executor_lock:
+            if _tts_executor is None:
+                _tts_executor = ThreadPoolExecutor(
+                    max_workers=_TTS_MAX_WORKERS, thread_name_prefix="tts"
+                )
+    return _tts_executor
 
 
 # Singleton
@@ -545,3 +1127,45 @@ def get_tts_engine() -> TTSEngine:
     if _tts_engine is None:
         _tts_engine = TTSEngine()
     return _tts_engine
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STARTUP WARMUP
+# ─────────────────────────────────────────────────────────────────────────────
+def warmup(use_mock: bool = True) -> dict[str, float]:
+    """
+    Build the lazy singletons (VoiceAgent chain, TTSEngine, BLIP pipeline)
+    and run one throwaway call through each, so the first user request after
+    a deploy doesn't pay the cold-start cost.
+
+    Args:
+        use_mock: When True the BLIP model is skipped (mock mode never uses it).
+
+    Returns:
+        Seconds spent warming each component, keyed by name. Failures are
+        logged and skipped — warmup never raises.
+    """
+    timings: dict[str, float] = {}
+
+    def _timed(name: str, fn) -> None:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            logger.warning("Warmup of %s failed: %s", name, e)
+            return
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    _timed("voice_agent", lambda: get_voice_agent()._build_chain())
+    _timed("tts_engine", lambda: get_tts_engine().synthesize(
+        "warm", "en", output_dir=os.path.join(tempfile.gettempdir(), "gruha_warmup"),
+        filename="warmup",
+    ))
+    if not use_mock:
+        def _warm_blip():
+            from PIL import Image
+            _caption_images([Image.new("RGB", (64, 64), color=(180, 160, 140))])
+        _timed("blip_pipeline", _warm_blip)
+
+    logger.info("AI warmup finished: %s", timings)
+    return timings
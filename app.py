@@ -10,26 +10,76 @@ Usage:
     # Production (Gunicorn)
     gunicorn -w 4 -b 0.0.0.0:5000 "app:create_application()"
 
+    # Production (ASGI via Hypercorn)
+    hypercorn -w 4 -b 0.0.0.0:5000 "app:create_asgi_application()"
+
     # With environment variable
     FLASK_ENV=production python app.py
 """
 
+import atexit
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 from app import create_app
 
 # ── Detect runtime environment ────────────────────────────────────────────────
 ENV = os.getenv("FLASK_ENV", os.getenv("APP_ENV", "development"))
 
+
+# ── Off-thread logging ────────────────────────────────────────────────────────
+class _PassThroughQueueHandler(QueueHandler):
+    """Enqueue records untouched; message and traceback formatting happen on the listener."""
+
+    def prepare(self, record):
+        return record
+
+
+def _install_queue_logging(flask_app):
+    """
+    Move the app logger's handlers (file/stream sinks set up by create_app)
+    behind a queue, so request threads only enqueue LogRecords and a
+    QueueListener thread does the formatting and I/O.
+    """
+    handlers = flask_app.logger.handlers
+    if not handlers or any(isinstance(h, QueueHandler) for h in handlers):
+        return flask_app
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    flask_app.logger.handlers = [_PassThroughQueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+    return flask_app
+
+
 # Create the Flask application
-application = create_app(ENV)   # 'application' is the Gunicorn/PaaS standard name
+application = _install_queue_logging(create_app(ENV))   # 'application' is the Gunicorn/PaaS standard name
 app = application               # Alias for dev convenience
 
+# ── Warm AI singletons in the background (opt-in) ─────────────────────────────
+if ENV != "development" and os.getenv("GRUHA_WARMUP") == "1":
+    import threading
+    from ai_engine import warmup
+
+    threading.Thread(
+        target=warmup,
+        kwargs={"use_mock": app.config.get("AI_USE_MOCK", True)},
+        name="ai-warmup",
+        daemon=True,
+    ).start()
+
 
 def create_application():
     """Factory function for Gunicorn entry point."""
-    return create_app(ENV)
+    return _install_queue_logging(create_app(ENV))
+
+
+def create_asgi_application():
+    """Factory function for ASGI servers (Hypercorn/Uvicorn)."""
+    from asgiref.wsgi import WsgiToAsgi
+    return WsgiToAsgi(_install_queue_logging(create_app(ENV)))
 
 
 if __name__ == "__main__":
@@ -54,10 +104,22 @@ if __name__ == "__main__":
             print(f"  {methods:20s}  {rule.rule}")
         print("=" * 60 + "\n")
 
-    app.run(
-        host=host,
-        port=port,
-        debug=debug,
-        use_reloader=debug,
-        threaded=True,
-    )
+    if debug:
+        app.run(
+            host=host,
+            port=port,
+            debug=debug,
+            use_reloader=debug,
+            threaded=True,
+        )
+    else:
+        # Werkzeug's server is for development only; serve over ASGI so
+        # I/O-bound views (BLIP, gTTS) don't pin one thread per request.
+        import asyncio
+        from asgiref.wsgi import WsgiToAsgi
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config as HypercornConfig
+
+        hc_config = HypercornConfig()
+        hc_config.bind = [f"{host}:{port}"]
+        asyncio.run(serve(WsgiToAsgi(app), hc_config))
@@ -12,22 +12,106 @@ Routes:
   POST /api/auth/change-password
 """
 
+import queue
+import threading
 from datetime import datetime, timezone
 
 from flask import Blueprint, request, current_app
 from flask_login import login_user, logout_user, current_user
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app import db, limiter
-from app.models.user import User
+from app.models.user import User, dummy_password_check
 from app.utils.security import (
     api_success, api_error, get_json_body,
     sanitise_text, sanitise_email,
     is_valid_email, is_strong_password,
-    login_required_api,
+    login_required_api, commit_relaxed,
 )
 
 auth_bp = Blueprint("auth", __name__)
 
+# Statements built once at import and executed with bound parameters
+_STMT_USER_ID_BY_EMAIL = select(User.id).where(User.email == bindparam("email"))
+_STMT_USER_BY_EMAIL    = select(User).where(User.email == bindparam("email"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LAST-LOGIN WRITER
+# ─────────────────────────────────────────────────────────────────────────────
+# Successful logins enqueue the user id instead of committing last_login_at
+# inline; a daemon thread flushes the queue once per interval with a single
+# UPDATE ... WHERE id IN (...), so bursts of logins share one transaction.
+_LOGIN_FLUSH_INTERVAL_S = 1.0
+
+_login_queue: "queue.Queue[int]" = queue.Queue()
+_login_flush_now      = threading.Event()
+_login_writer_lock    = threading.Lock()
+_login_writer_started = False
+
+
+def _login_writer(app) -> None:
+    """Daemon loop: batch queued user ids into one last_login_at UPDATE."""
+    while True:
+        user_ids = [_login_queue.get()]
+        _login_flush_now.wait(_LOGIN_FLUSH_INTERVAL_S)
+        while True:
+            try:
+                user_ids.append(_login_queue.get_nowait())
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                db.session.execute(
+                    update(User)
+                    .where(User.id.in_(set(user_ids)))
+                    .values(last_login_at=func.now())
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Failed to record last login for %d user(s)", len(user_ids))
+            finally:
+                db.session.remove()
+                for _ in user_ids:
+                    _login_queue.task_done()
+
+
+def flush_logins() -> None:
+    """
+    Write every queued last_login_at now and wait until it is committed
+    (tests, graceful shutdown). Returns at once when nothing is queued.
+    """
+    _login_flush_now.set()
+    try:
+        _login_queue.join()
+    finally:
+        _login_flush_now.clear()
+
+
+def _record_login(user: User) -> None:
+    """
+    Stamp user.last_login_at without adding a commit to the login request.
+
+    The column is written by the background writer (see flush_logins());
+    the in-memory instance gets the same timestamp as a committed value, so
+    the login response's to_dict() is current without dirtying the session.
+    """
+    global _login_writer_started
+    if not _login_writer_started:
+        with _login_writer_lock:
+            if not _login_writer_started:
+                threading.Thread(
+                    target=_login_writer,
+                    args=(current_app._get_current_object(),),
+                    name="last-login-writer",
+                    daemon=True,
+                ).start()
+                _login_writer_started = True
+    _login_queue.put(user.id)
+    set_committed_value(user, "last_login_at", datetime.now(timezone.utc))
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # REGISTER
@@ -73,7 +157,7 @@ def register():
         role = "homeowner"
 
     # Duplicate check
-    if User.query.filter_by(email=email).first():
+    if db.session.execute(_STMT_USER_ID_BY_EMAIL, {"email": email}).first():
         return api_error("An account with this email already exists.", 409)
 
     # Create user
@@ -128,9 +212,12 @@ def login():
     password = data["password"]
     remember = bool(data.get("remember", False))
 
-    user = User.query.filter_by(email=email).first()
+    user = db.session.execute(_STMT_USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
 
-    # Use constant-time comparison via check_password (prevents timing attacks)
+    # Hash the password even for unknown emails so both failures take the
+    # same time; check_password itself compares in constant time.
+    if user is None:
+        dummy_password_check(password)
     if not user or not user.check_password(password):
         current_app.logger.warning("Failed login attempt for email=%s", email)
         return api_error("Invalid email or password.", 401)
@@ -138,9 +225,13 @@ def login():
     if not user.is_active:
         return api_error("Your account has been deactivated. Please contact support.", 403)
 
-    # Update last login timestamp
-    user.last_login_at = datetime.now(timezone.utc)
-    db.session.commit()
+    # Upgrade hashes made with an older method/cost while we hold the plaintext
+    if user.password_needs_rehash():
+        user.password = password
+        db.session.commit()
+
+    # Update last login timestamp (batched off the request path)
+    _record_login(user)
 
     login_user(user, remember=remember)
     current_app.logger.info("User logged in: id=%d email=%s", user.id, email)
@@ -202,7 +293,7 @@ def update_profile():
             current_user.role = data["role"]
 
     try:
-        db.session.commit()
+        commit_relaxed(db.session)
     except Exception as e:
         db.session.rollback()
         return api_error("Profile update failed.", 500)
@@ -241,7 +332,7 @@ def change_password():
     current_user.password = data["new_password"]
 
     try:
-        db.session.commit()
+        commit_relaxed(db.session)
         current_app.logger.info("Password changed: user_id=%d", current_user.id)
     except Exception:
         db.session.rollback()
@@ -16,26 +16,39 @@ Routes:
   GET    /api/booking/catalogue      – Browse available furniture catalogue
 """
 
+import hashlib
+from collections import defaultdict
 from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
 
-from flask import Blueprint, request
+from flask import Blueprint, abort, current_app, request
 from flask_login import current_user
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import IntegrityError
 
 from app import db, limiter
 from app.models.booking import FurnitureBooking
+from app.models.design import DesignProject
 from app.utils.security import (
     api_success, api_error, login_required_api,
-    sanitise_text, get_json_body, paginate_query,
+    sanitise_text, get_json_body, paginate_query, keyset_paginate, commit_relaxed,
+    get_keyset_cursor,
 )
 
 booking_bp = Blueprint("booking", __name__)
 
+# Statement built once at import and executed with bound parameters
+_STMT_OWNS_PROJECT = select(1).where(
+    DesignProject.id == bindparam("project_id"),
+    DesignProject.user_id == bindparam("user_id"),
+)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # FURNITURE CATALOGUE  (static data in lieu of a product DB)
 # ─────────────────────────────────────────────────────────────────────────────
-FURNITURE_CATALOGUE: list[dict] = [
+FURNITURE_CATALOGUE: tuple[dict, ...] = (
     {"id": "SOF-MOD-001", "name": "Sectional Sofa",          "category": "Seating",   "style": "Modern",       "price_inr": 45000, "in_stock": True},
     {"id": "SOF-TRD-002", "name": "Teak Diwan",              "category": "Seating",   "style": "Traditional",  "price_inr": 35000, "in_stock": True},
     {"id": "TBL-MOD-003", "name": "Glass Coffee Table",      "category": "Table",     "style": "Modern",       "price_inr": 12000, "in_stock": True},
@@ -48,15 +61,70 @@ FURNITURE_CATALOGUE: list[dict] = [
     {"id": "PLN-NAT-010", "name": "Monstera Plant + Pot",    "category": "Decor",     "style": "Biophilic",    "price_inr": 2500,  "in_stock": True},
     {"id": "MIR-MOD-011", "name": "Oversized Round Mirror",  "category": "Decor",     "style": "Modern",       "price_inr": 8500,  "in_stock": True},
     {"id": "SOF-HAV-012", "name": "Jharokha Frame (Decor)",  "category": "Architectural","style": "Haveli",    "price_inr": 65000, "in_stock": True},
-]
+)
+
+_CATALOGUE_MAP: MappingProxyType = MappingProxyType({item["id"]: item for item in FURNITURE_CATALOGUE})
+
+
+def _bucket(key: str) -> dict[str, tuple[tuple[dict, ...], frozenset[str]]]:
+    """Group catalogue items by lowercased `key` → (items in catalogue order, their ids)."""
+    groups: dict[str, list[dict]] = defaultdict(list)
+    for item in FURNITURE_CATALOGUE:
+        groups[item[key].lower()].append(item)
+    return {k: (tuple(v), frozenset(i["id"] for i in v)) for k, v in groups.items()}
+
+
+# Filter indexes, built once: the catalogue is immutable at runtime
+_BY_STYLE    = _bucket("style")
+_BY_CATEGORY = _bucket("category")
+_IN_STOCK    = tuple(i for i in FURNITURE_CATALOGUE if i["in_stock"])
+_IN_STOCK_BUCKET = (_IN_STOCK, frozenset(i["id"] for i in _IN_STOCK))
+_EMPTY_BUCKET: tuple[tuple[dict, ...], frozenset[str]] = ((), frozenset())
+
 
-_CATALOGUE_MAP: dict[str, dict] = {item["id"]: item for item in FURNITURE_CATALOGUE}
+def _filter_catalogue(style: str, category: str, in_stock_only: bool) -> list[dict]:
+    """Intersect the precomputed buckets for the given filters, keeping catalogue order."""
+    buckets = []
+    if style:
+        buckets.append(_BY_STYLE.get(style.lower(), _EMPTY_BUCKET))
+    if category:
+        buckets.append(_BY_CATEGORY.get(category.lower(), _EMPTY_BUCKET))
+    if in_stock_only:
+        buckets.append(_IN_STOCK_BUCKET)
+    if not buckets:
+        return list(FURNITURE_CATALOGUE)
+
+    buckets.sort(key=lambda b: len(b[0]))
+    items, _ = buckets[0]
+    other_ids = [ids for _, ids in buckets[1:]]
+    return [i for i in items if all(i["id"] in ids for ids in other_ids)]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # BROWSE CATALOGUE
 # ─────────────────────────────────────────────────────────────────────────────
+@lru_cache(maxsize=64)
+def _catalogue_body(style: str, cat: str, in_stock_only: bool) -> tuple[bytes, str]:
+    """
+    Serialised catalogue response and its ETag for one filter combination.
+    The catalogue never changes at runtime, so each body is built once.
+    """
+    items = _filter_catalogue(style, cat, in_stock_only)
+    payload = {
+        "success": True,
+        "message": "Success",
+        "data": {
+            "catalogue": items,
+            "total":     len(items),
+            "filters": {"style": style, "category": cat},
+        },
+    }
+    body = current_app.json.dumps(payload).encode("utf-8")
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
 @booking_bp.get("/catalogue")
+@limiter.exempt
 def browse_catalogue():
     """
     Return the furniture catalogue with optional filtering.
@@ -65,26 +133,20 @@ def browse_catalogue():
         style     – filter by style name
         category  – filter by category
         in_stock  – '1' for in-stock only
+
+    Responses carry a strong ETag; If-None-Match revalidation returns 304.
+    Exempt from the default rate limit: the body is static and cached.
     """
-    items   = list(FURNITURE_CATALOGUE)
     style   = request.args.get("style",    "").strip()
     cat     = request.args.get("category", "").strip()
     in_stock = request.args.get("in_stock")
 
-    if style:
-        items = [i for i in items if i["style"].lower() == style.lower()]
-    if cat:
-        items = [i for i in items if i["category"].lower() == cat.lower()]
-    if in_stock == "1":
-        items = [i for i in items if i["in_stock"]]
+    body, etag = _catalogue_body(style, cat, in_stock == "1")
 
-    return api_success(
-        data={
-            "catalogue": items,
-            "total":     len(items),
-            "filters": {"style": style, "category": cat},
-        }
-    )
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response.make_conditional(request)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -145,7 +207,23 @@ def create_booking():
     if not item["in_stock"]:
         return api_error(f"'{item['name']}' is currently out of stock.", 409)
 
-    # Duplicate pending booking check
+    # Linked design project must exist and belong to the user (single
+    # parameterised SELECT 1, reused from the compiled-statement cache)
+    if design_project_id:
+        try:
+            design_project_id = int(design_project_id)
+        except (TypeError, ValueError):
+            return api_error("design_project_id must be an integer.", 400)
+        owns_project = db.session.execute(
+            _STMT_OWNS_PROJECT,
+            {"project_id": design_project_id, "user_id": current_user.id},
+        ).scalar()
+        if not owns_project:
+            return api_error(f"Design project #{design_project_id} not found.", 404)
+
+    # Duplicate pending booking check. Kept on every dialect: no unique index
+    # on (user_id, furniture_id) WHERE status='pending' ships with the schema,
+    # so the IntegrityError branch below only covers databases that add one.
     existing = FurnitureBooking.query.filter_by(
         user_id=current_user.id,
         furniture_id=furniture_id,
@@ -171,7 +249,7 @@ def create_booking():
         delivery_address = delivery_address,
         delivery_date    = delivery_date,
         delivery_notes   = delivery_notes or None,
-        design_project_id = int(design_project_id) if design_project_id else None,
+        design_project_id = design_project_id or None,
         status           = "pending",
     )
     booking.compute_total()
@@ -182,7 +260,9 @@ def create_booking():
     except IntegrityError:
         db.session.rollback()
         return api_error(
-            f"You already have a pending booking for '{item['name']}'.", 409
+            f"You already have a pending booking for '{item['name']}'. "
+            f"Cancel it before creating a new one.",
+            409,
         )
     except Exception as e:
         db.session.rollback()
@@ -209,21 +289,49 @@ def list_bookings():
         status   (str, optional)  – filter by status
         page     (int, default 1)
         per_page (int, default 20)
+        count    ('0' skips the COUNT(*); total/pages are then null)
+        cursor   (str, optional)  – opaque token from a previous response's
+                 pagination.next_cursor; switches to seek paging
+                 (no OFFSET, no COUNT)
+
+    Every response carries the same pagination keys. OFFSET pages fill
+    page/total/pages/next_page and also a next_cursor, so a client can
+    switch to seek paging after any page; cursor pages null the OFFSET keys.
     """
     page     = max(1, request.args.get("page",     1,  type=int))
     per_page = max(1, request.args.get("per_page", 20, type=int))
     status   = request.args.get("status")
+    count    = request.args.get("count", "1") != "0"
+    cursor, err = get_keyset_cursor()
+    if err:
+        return api_error(err, 400)
 
-    query = FurnitureBooking.query.filter_by(user_id=current_user.id).order_by(
-        FurnitureBooking.created_at.desc()
-    )
+    query = FurnitureBooking.query.filter_by(user_id=current_user.id)
     if status:
         query = query.filter_by(status=status)
 
-    paged = paginate_query(query, page=page, per_page=per_page)
+    if cursor:
+        paged = keyset_paginate(query, FurnitureBooking, per_page=per_page,
+                                after_created_at=cursor[0], after_id=cursor[1])
+        return api_success(data=paged)
+
+    query = query.order_by(FurnitureBooking.created_at.desc(), FurnitureBooking.id.desc())
+    paged = paginate_query(query, page=page, per_page=per_page, count=count, keyset=True)
     return api_success(data=paged)
 
 
+def _get_own_booking(booking_id: int) -> FurnitureBooking:
+    """
+    Primary-key lookup via Session.get (identity-map hit or PK index probe),
+    then an ownership check. Someone else's booking is a 404, not a 403, so
+    its existence is not leaked.
+    """
+    booking = db.session.get(FurnitureBooking, booking_id)
+    if booking is None or booking.user_id != current_user.id:
+        abort(404)
+    return booking
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # GET SINGLE BOOKING
 # ─────────────────────────────────────────────────────────────────────────────
@@ -231,9 +339,7 @@ def list_bookings():
 @login_required_api
 def get_booking(booking_id: int):
     """Return details of a single booking (must belong to current user)."""
-    booking = FurnitureBooking.query.filter_by(
-        id=booking_id, user_id=current_user.id
-    ).first_or_404()
+    booking = _get_own_booking(booking_id)
     return api_success(data=booking.to_dict())
 
 
@@ -254,9 +360,7 @@ def cancel_booking(booking_id: int):
         - Only 'pending' or 'confirmed' bookings may be cancelled.
         - Delivered or already-cancelled bookings return 409.
     """
-    booking = FurnitureBooking.query.filter_by(
-        id=booking_id, user_id=current_user.id
-    ).first_or_404()
+    booking = _get_own_booking(booking_id)
 
     if not booking.is_cancellable:
         return api_error(
@@ -271,7 +375,7 @@ def cancel_booking(booking_id: int):
     booking.cancel(reason=reason)
 
     try:
-        db.session.commit()
+        commit_relaxed(db.session)
     except Exception:
         db.session.rollback()
         return api_error("Failed to cancel booking.", 500)
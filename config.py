@@ -33,16 +33,33 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_pre_ping": True,
-        "pool_recycle": 300,
+        "pool_pre_ping":    True,
+        "pool_recycle":     300,
+        "query_cache_size": 1200,   # compiled-SQL LRU (SQLAlchemy default: 500)
     }
 
     # ── File Upload ───────────────────────────────────────────────────────────
     UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads", "images")
     AUDIO_FOLDER  = os.path.join(BASE_DIR, "uploads", "audio")
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10 MB hard limit
+    MAX_JSON_BODY      = 64 * 1024         # JSON API bodies are small forms
     ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "webp", "heic"}
     ALLOWED_AUDIO_EXTENSIONS = {"mp3", "wav", "ogg"}
+    IMAGE_URL_TTL = 24 * 3600              # lifetime of signed image URLs (s)
+    # When set (e.g. "/protected-uploads/"), serve_image hands the file to
+    # nginx via X-Accel-Redirect instead of streaming it from Python.
+    IMAGE_ACCEL_REDIRECT_PREFIX = os.getenv("IMAGE_ACCEL_REDIRECT_PREFIX", "")
+    # Same for serve_audio (nginx internal location aliasing AUDIO_FOLDER).
+    AUDIO_ACCEL_REDIRECT_PREFIX = os.getenv("AUDIO_ACCEL_REDIRECT_PREFIX", "")
+    # Apache/lighttpd: let send_from_directory emit X-Sendfile instead of a body.
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+
+    # ── Password hashing ──────────────────────────────────────────────────────
+    # Werkzeug method for new hashes. scrypt is memory-hard and runs entirely
+    # inside OpenSSL; "pbkdf2" selects PBKDF2-HMAC-SHA256 with the iteration
+    # count below. Older hashes still verify and are upgraded on next login.
+    PASSWORD_HASH_METHOD     = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "260000"))
 
     # ── Session ───────────────────────────────────────────────────────────────
     SESSION_COOKIE_HTTPONLY   = True
@@ -56,8 +73,11 @@ class Config:
     WTF_CSRF_SSL_STRICT    = False         # True in production
 
     # ── Rate Limiting ─────────────────────────────────────────────────────────
+    # Shared Redis storage keeps limits global across gunicorn workers and
+    # restarts; memory:// (per-process) is only the no-Redis fallback.
     RATELIMIT_DEFAULT        = "200 per day;50 per hour"
-    RATELIMIT_STORAGE_URL    = "memory://"
+    RATELIMIT_STORAGE_URI    = os.getenv("REDIS_URL", "memory://")
+    RATELIMIT_STORAGE_OPTIONS = {"max_connections": 64}   # pooled Redis connections
     RATELIMIT_HEADERS_ENABLED = True
     RATELIMIT_STRATEGY       = "fixed-window"
 
@@ -66,6 +86,12 @@ class Config:
     AI_USE_MOCK        = os.getenv("AI_USE_MOCK", "true").lower() == "true"
     AI_MAX_TOKENS      = 512
     AI_TEMPERATURE     = 0.7
+    # Opt-in: run /api/design/generate analysis on an in-process pool and
+    # answer 202; clients poll GET /api/design/projects/<id> for the result.
+    # Jobs are not durable — a worker restart drops them (project stays
+    # "processing", quota stays spent) — so inline analysis is the default.
+    AI_BACKGROUND_ANALYSIS = os.getenv("AI_BACKGROUND_ANALYSIS", "false").lower() == "true"
+    AI_WORKER_THREADS      = int(os.getenv("AI_WORKER_THREADS", "2"))
 
     # ── LangChain ─────────────────────────────────────────────────────────────
     OPENAI_API_KEY     = os.getenv("OPENAI_API_KEY", "")
@@ -74,6 +100,10 @@ class Config:
     # ── gTTS ──────────────────────────────────────────────────────────────────
     TTS_DEFAULT_LANG   = "en"
     TTS_SLOW_SPEECH    = False
+    # Opt-in: synthesize /api/voice/ask audio on the TTS pool and return its
+    # URL straight away; GET /api/voice/audio/<file> (in any worker) waits for
+    # the render. AUDIO_FOLDER must be shared by all workers.
+    TTS_BACKGROUND     = os.getenv("TTS_BACKGROUND", "false").lower() == "true"
     SUPPORTED_LANGUAGES = {
         "english": "en",
         "telugu":  "te",
@@ -95,11 +125,18 @@ class Config:
 
     @staticmethod
     def init_app(app):
-        """Run post-init setup: ensure upload directories exist."""
+        """
+        Run post-init setup: ensure upload directories exist, install the JSON
+        provider and the upload-streaming request class.
+        """
         os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
         os.makedirs(app.config["AUDIO_FOLDER"],  exist_ok=True)
         os.makedirs(app.config["LOG_FOLDER"],     exist_ok=True)
 
+        from app.utils.security import OrjsonJSONProvider, UploadRequest
+        app.json = OrjsonJSONProvider(app)
+        app.request_class = UploadRequest
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DEVELOPMENT
@@ -110,6 +147,8 @@ class DevelopmentConfig(Config):
     WTF_CSRF_ENABLED = False          # Easier API testing in dev
     RATELIMIT_DEFAULT = "10000 per day"  # Relaxed for local dev
     AI_USE_MOCK = True                # Always mock in dev — no GPU needed
+    PASSWORD_HASH_METHOD     = "pbkdf2"
+    PASSWORD_HASH_ITERATIONS = 50_000  # Faster local register/login
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -120,7 +159,11 @@ class TestingConfig(Config):
     DEBUG     = True
     WTF_CSRF_ENABLED = False
     AI_USE_MOCK      = True
+    AI_BACKGROUND_ANALYSIS = False   # Synchronous, deterministic analysis in tests
+    TTS_BACKGROUND   = False
     RATELIMIT_ENABLED = False
+    PASSWORD_HASH_METHOD     = "pbkdf2"
+    PASSWORD_HASH_ITERATIONS = 1_000  # Hashing cost is irrelevant in tests
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     UPLOAD_FOLDER = "/tmp/gruha_test_uploads"
     AUDIO_FOLDER  = "/tmp/gruha_test_audio"
@@ -136,7 +179,6 @@ class ProductionConfig(Config):
     LOG_LEVEL = "WARNING"
     AI_USE_MOCK = False
     RATELIMIT_DEFAULT = "500 per day;100 per hour"
-    RATELIMIT_STORAGE_URL = os.getenv("REDIS_URL", "memory://")
 
     @classmethod
     def init_app(cls, app):
@@ -0,0 +1,53 @@
+"""
+tests/conftest.py
+=================
+Shared fixtures for the API test modules: a session-wide app on in-memory
+SQLite, a test client, and table cleanup between tests.
+"""
+
+import pytest
+from app import create_app, db as _db
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Create test Flask application."""
+    _app = create_app("testing")
+    with _app.app_context():
+        _db.create_all()
+        yield _app
+        _db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def delete_order(app):
+    """Tables children-first; metadata.sorted_tables re-sorts on every access."""
+    return tuple(reversed(_db.metadata.sorted_tables))
+
+
+@pytest.fixture
+def clean_db(app, delete_order):
+    """Wipe tables between tests (modules opt in with pytestmark)."""
+    with app.app_context():
+        _db.session.remove()
+        for table in delete_order:
+            _db.session.execute(table.delete())
+        _db.session.commit()
+
+
+@pytest.fixture
+def auth_client(client):
+    """A test client logged in as a freshly registered user."""
+    rv = client.post("/api/auth/register", json={
+        "name": "Test User",
+        "email": "owner@test.com",
+        "password": "Gruha@1234",
+    })
+    assert rv.status_code == 201
+    client.user_id = rv.get_json()["data"]["id"]
+    return client
@@ -8,31 +8,115 @@ Routes:
   GET  /api/design/projects          – List user's design projects
   GET  /api/design/projects/<id>     – Get single project with full AI result
   DELETE /api/design/projects/<id>   – Delete a project
+  DELETE /api/design/projects?ids=1,2 – Delete several projects at once
   POST /api/design/projects/<id>/rate – Submit a star rating + feedback
 """
 
+import mimetypes
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Blueprint, request, current_app, send_from_directory
+from flask import Blueprint, g, request, current_app, send_from_directory
 from flask_login import current_user
+from sqlalchemy import bindparam, delete, exists, select, update
+from sqlalchemy.orm import defer
+from werkzeug.utils import secure_filename
 
 from app import db, limiter
+from app.models.booking import FurnitureBooking
 from app.models.design import DesignProject
 from app.utils.security import (
     api_success, api_error, login_required_api,
     ai_quota_required, validate_image_file,
     generate_secure_filename, sanitise_text, paginate_query,
+    keyset_paginate, get_keyset_cursor,
+    records_to_columns, persist_upload,
+    sign_image_url, verify_image_signature,
 )
 
 design_bp = Blueprint("design", __name__)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# BACKGROUND ANALYSIS
+# ─────────────────────────────────────────────────────────────────────────────
+_ai_executor: ThreadPoolExecutor | None = None
+_ai_executor_lock = threading.Lock()
+
+
+def _get_ai_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Lazily create the process-wide pool that runs queued AI analyses."""
+    global _ai_executor
+    if _ai_executor is None:
+        with _ai_executor_lock:
+            if _ai_executor is None:
+                _ai_executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="ai-analysis"
+                )
+    return _ai_executor
+
+
+def _run_analysis(project: DesignProject, dimensions: dict | None) -> tuple[dict, float]:
+    """Run the AI engine for `project`, store its result, and return (result, confidence)."""
+    from ai_engine import generate_design as ai_generate
+
+    result = ai_generate(
+        image_path = project.image_path,
+        style      = project.style,
+        room_type  = project.room_type,
+        dimensions = dimensions,
+    )
+    confidence = result.get("project_meta", {}).get("confidence", 0.0)
+    project.mark_completed(result, confidence)
+    return result, confidence
+
+
+def _analyse_in_background(app, project_id: int, dimensions: dict | None) -> None:
+    """Pool task: analyse a queued project in its own app context and session."""
+    with app.app_context():
+        project = db.session.get(DesignProject, project_id)
+        if project is None:   # deleted while queued
+            return
+        try:
+            _, confidence = _run_analysis(project, dimensions)
+            db.session.commit()
+            app.logger.info(
+                "AI design complete: project_id=%d style=%s confidence=%.3f",
+                project_id, project.style, confidence
+            )
+        except Exception as e:
+            db.session.rollback()
+            project.mark_failed(str(e))
+            db.session.commit()
+            app.logger.error("AI generation error: project_id=%d – %s", project_id, e, exc_info=True)
+
+
+_COLUMNAR_KEYS = ("furniture", "color_scheme")
+
+
+def _shape_result(ai_result: dict) -> dict:
+    """
+    Apply the client's requested wire format to an AI result.
+
+    Lists of objects by default; with ?format=soa the per-item lists go out
+    as struct-of-arrays (keys emitted once). Used by every endpoint that
+    returns an AI result, so one project always has one shape.
+    """
+    if request.args.get("format") != "soa":
+        return ai_result
+    shaped = dict(ai_result)
+    for key in _COLUMNAR_KEYS:
+        if isinstance(shaped.get(key), list):
+            shaped[key] = records_to_columns(shaped[key])
+    return shaped
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # GENERATE DESIGN  (core endpoint)
 # ─────────────────────────────────────────────────────────────────────────────
 @design_bp.post("/generate")
 @login_required_api
-@ai_quota_required
 @limiter.limit("30 per hour")
 def generate_design():
     """
@@ -46,13 +130,22 @@ def generate_design():
         room_width  (float, optional) – room width in feet
         title       (str, optional)   – project name
 
+    Query params:
+        format      – 'soa' returns furniture/color_scheme as struct-of-arrays
+                      (keys emitted once); default is lists of objects
+
+    With AI_BACKGROUND_ANALYSIS enabled the analysis is queued and the
+    endpoint answers 202 with {"project_id", "status": "processing", ...};
+    poll GET /api/design/projects/<id> for the finished result. Otherwise
+    it runs inline and answers 201:
+
     Response JSON:
         {
           "project_id": 42,
           "status": "completed",
           "ai_result": {
-            "furniture":     [...],
-            "color_scheme":  [...],
+            "furniture":     [{...}, ...],
+            "color_scheme":  [{...}, ...],
             "placement":     {...},
             "design_tips":   [...],
             "estimated_budget_inr": {...}
@@ -82,6 +175,15 @@ def generate_design():
     except (ValueError, TypeError):
         return api_error("room_length and room_width must be numeric values.", 400)
 
+    # Quota is reserved only once the request is known to be well-formed, so
+    # rejected uploads cost no reserve/refund commits
+    return _generate_with_quota(file, style, room_type, title, room_length, room_width)
+
+
+@ai_quota_required
+def _generate_with_quota(file, style: str, room_type: str, title: str,
+                         room_length: float | None, room_width: float | None):
+    """Steps 3-6 of generate_design(), run under a reserved AI quota unit."""
     # ── 3. Save uploaded file ─────────────────────────────────────────────────
     upload_dir = current_app.config["UPLOAD_FOLDER"]
     os.makedirs(upload_dir, exist_ok=True)
@@ -90,10 +192,10 @@ def generate_design():
     image_path = os.path.join(upload_dir, safe_name)
 
     try:
-        file.save(image_path)
+        size_bytes = persist_upload(file, image_path)
         current_app.logger.info(
             "Image saved: user=%d file=%s size=%d bytes",
-            current_user.id, safe_name, os.path.getsize(image_path)
+            current_user.id, safe_name, size_bytes
         )
     except Exception as e:
         current_app.logger.error("File save error: %s", e)
@@ -121,24 +223,34 @@ def generate_design():
         return api_error("Failed to create design project.", 500)
 
     # ── 5. Run AI analysis ─────────────────────────────────────────────────────
-    try:
-        from ai_engine import generate_design as ai_generate
-
-        dimensions = {
-            "length": room_length,
-            "width":  room_width,
-        } if (room_length and room_width) else None
-
-        result = ai_generate(
-            image_path = image_path,
-            style      = style,
-            room_type  = room_type,
-            dimensions = dimensions,
+    dimensions = {
+        "length": room_length,
+        "width":  room_width,
+    } if (room_length and room_width) else None
+
+    if current_app.config.get("AI_BACKGROUND_ANALYSIS", False):
+        # Quota was reserved by ai_quota_required and stays spent even if the
+        # queued job later fails, so abandoned jobs cannot bypass it
+        _get_ai_executor(current_app.config.get("AI_WORKER_THREADS", 2)).submit(
+            _analyse_in_background,
+            current_app._get_current_object(), project.id, dimensions,
+        )
+        return api_success(
+            data={
+                "project_id":   project.id,
+                "title":        project.title,
+                "status":       project.status,
+                "style":        project.style,
+                "room_type":    project.room_type,
+                "image_url":    sign_image_url(safe_name, current_user.id),
+                "quota_remaining": g.quota_remaining,
+            },
+            message=f"Design analysis started. Poll /api/design/projects/{project.id} for the result.",
+            status_code=202,
         )
 
-        confidence = result.get("project_meta", {}).get("confidence", 0.0)
-        project.mark_completed(result, confidence)
-        current_user.consume_ai_quota()
+    try:
+        result, confidence = _run_analysis(project, dimensions)
         db.session.commit()
 
         current_app.logger.info(
@@ -157,7 +269,9 @@ def generate_design():
         )
 
     # ── 6. Build and return structured response ───────────────────────────────
-    ai_result = project.ai_result or {}
+    # Built from the engine's result rather than project.ai_result: the commit
+    # above expired the instance, and re-reading would reload the JSON column.
+    ai_result = result or {}
     return api_success(
         data={
             "project_id":   project.id,
@@ -165,20 +279,17 @@ def generate_design():
             "status":       project.status,
             "style":        project.style,
             "room_type":    project.room_type,
-            "ai_confidence": project.ai_confidence,
-            "image_url":    f"/api/design/images/{safe_name}",
-            "ai_result": {
+            "ai_confidence": confidence,
+            "image_url":    sign_image_url(safe_name, current_user.id),
+            "ai_result": _shape_result({
                 "furniture":              ai_result.get("furniture", []),
                 "color_scheme":          ai_result.get("color_scheme", []),
                 "placement":             ai_result.get("placement", {}),
                 "design_tips":           ai_result.get("design_tips", []),
                 "estimated_budget_inr":  ai_result.get("estimated_budget_inr", {}),
                 "project_meta":          ai_result.get("project_meta", {}),
-            },
-            "quota_remaining": max(
-                0,
-                current_user.ai_analyses_limit - current_user.ai_analyses_used
-            ),
+            }),
+            "quota_remaining": g.quota_remaining,
         },
         message="Design analysis complete!",
         status_code=201,
@@ -198,18 +309,36 @@ def list_projects():
         page     (int, default 1)
         per_page (int, default 20, max 100)
         status   (str, optional) filter by status
+        cursor   (str, optional) opaque token from a previous response's
+                 pagination.next_cursor; switches to seek paging
+                 (no OFFSET, no COUNT)
+
+    Same pagination contract as GET /api/booking/: OFFSET pages carry
+    page/total/pages plus a next_cursor; cursor pages null the OFFSET keys.
     """
     page     = max(1, request.args.get("page",     1,  type=int))
     per_page = max(1, request.args.get("per_page", 20, type=int))
     status   = request.args.get("status")
+    cursor, err = get_keyset_cursor()
+    if err:
+        return api_error(err, 400)
 
-    query = DesignProject.query.filter_by(user_id=current_user.id).order_by(
-        DesignProject.created_at.desc()
-    )
+    query = DesignProject.query.filter_by(user_id=current_user.id)
     if status:
         query = query.filter_by(status=status)
 
-    paged = paginate_query(query, page=page, per_page=per_page)
+    # List rows never serialise ai_result, so leave the JSON blob unloaded
+    load_options = [defer(DesignProject.ai_result)]
+
+    if cursor:
+        paged = keyset_paginate(query, DesignProject, per_page=per_page,
+                                after_created_at=cursor[0], after_id=cursor[1],
+                                load_options=load_options)
+        return api_success(data=paged)
+
+    query = query.order_by(DesignProject.created_at.desc(), DesignProject.id.desc())
+    paged = paginate_query(query, page=page, per_page=per_page,
+                           load_options=load_options, keyset=True)
     return api_success(data=paged)
 
 
@@ -219,12 +348,21 @@ def list_projects():
 @design_bp.get("/projects/<int:project_id>")
 @login_required_api
 def get_project(project_id: int):
-    """Return full details of a single design project (including AI result)."""
+    """
+    Return full details of a single design project (including AI result).
+
+    Query params:
+        format  – 'soa' returns furniture/color_scheme as struct-of-arrays,
+                  as for POST /generate
+    """
     project = DesignProject.query.filter_by(
         id=project_id, user_id=current_user.id
     ).first_or_404()
 
-    return api_success(data=project.to_dict(include_result=True))
+    data = project.to_dict(include_result=True)
+    if data.get("ai_result"):
+        data["ai_result"] = _shape_result(data["ai_result"])
+    return api_success(data=data)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -255,6 +393,66 @@ def delete_project(project_id: int):
     return api_success(message=f"Project #{project_id} deleted.")
 
 
+_BULK_DELETE_MAX = 200
+
+
+@design_bp.delete("/projects")
+@login_required_api
+def bulk_delete_projects():
+    """
+    Delete several of the user's projects and their image files.
+
+    Query params:
+        ids  (str, required) – comma-separated project IDs, at most 200
+
+    One DELETE ... RETURNING image_path replaces a SELECT + DELETE per
+    project; IDs that don't exist or belong to someone else are ignored.
+    The Core DELETE skips ORM cascades, so bookings linked to the deleted
+    projects are unlinked (design_project_id -> NULL) in the same transaction,
+    as the ORM would do for the single-project delete.
+    """
+    try:
+        ids = {int(i) for i in request.args.get("ids", "").split(",") if i.strip()}
+    except ValueError:
+        return api_error("ids must be a comma-separated list of integers.", 400)
+    if not ids:
+        return api_error("Provide at least one project id in ?ids=.", 400)
+    if len(ids) > _BULK_DELETE_MAX:
+        return api_error(f"At most {_BULK_DELETE_MAX} projects can be deleted at once.", 400)
+
+    owned = (DesignProject.id.in_(ids), DesignProject.user_id == current_user.id)
+    try:
+        db.session.execute(
+            update(FurnitureBooking)
+            .where(FurnitureBooking.design_project_id.in_(
+                select(DesignProject.id).where(*owned)
+            ))
+            .values(design_project_id=None)
+        )
+        image_paths = db.session.execute(
+            delete(DesignProject).where(*owned).returning(DesignProject.image_path)
+        ).scalars().all()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return api_error("Could not delete projects.", 500)
+
+    for path in image_paths:
+        if not path:
+            continue
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            current_app.logger.warning("Could not delete image file: %s", e)
+
+    return api_success(
+        data={"deleted": len(image_paths)},
+        message=f"{len(image_paths)} project(s) deleted.",
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # RATE / FEEDBACK
 # ─────────────────────────────────────────────────────────────────────────────
@@ -293,16 +491,53 @@ def rate_project(project_id: int):
 # ─────────────────────────────────────────────────────────────────────────────
 # SERVE UPLOADED IMAGES
 # ─────────────────────────────────────────────────────────────────────────────
+_IMAGE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Boolean ownership probe for unsigned image URLs: SELECT EXISTS(...) never
+# reads the row itself (and so never the ai_result JSON)
+_STMT_OWNS_IMAGE = select(exists().where(
+    DesignProject.image_filename == bindparam("filename"),
+    DesignProject.user_id == bindparam("user_id"),
+))
+
+
 @design_bp.get("/images/<path:filename>")
 @login_required_api
 def serve_image(filename: str):
-    """Serve an uploaded room image (only to its owner)."""
-    # Verify ownership
-    project = DesignProject.query.filter_by(
-        image_filename=filename, user_id=current_user.id
-    ).first()
-    if not project:
+    """
+    Serve an uploaded room image (only to its owner).
+
+    URLs from sign_image_url() (?u=&e=&s=) are authorised by their HMAC
+    signature alone; unsigned URLs fall back to a project ownership lookup.
+    """
+    signed_user = request.args.get("u", type=int)
+    expires     = request.args.get("e", type=int)
+    sig         = request.args.get("s", "")
+
+    if signed_user is not None and expires is not None and sig:
+        authorised = (
+            signed_user == current_user.id
+            and verify_image_signature(filename, signed_user, expires, sig)
+        )
+    else:
+        authorised = db.session.execute(
+            _STMT_OWNS_IMAGE, {"filename": filename, "user_id": current_user.id}
+        ).scalar()
+    if not authorised:
         return api_error("Image not found.", 404)
 
-    upload_dir = current_app.config["UPLOAD_FOLDER"]
-    return send_from_directory(upload_dir, filename)
+    accel_prefix = current_app.config.get("IMAGE_ACCEL_REDIRECT_PREFIX")
+    if accel_prefix:
+        # nginx keeps the upstream Content-Type, so it must not be text/html
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        )
+        response.headers["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + secure_filename(filename)
+    else:
+        # Conditional send: ETag/Last-Modified from the file, 304 on revalidation
+        upload_dir = current_app.config["UPLOAD_FOLDER"]
+        response = send_from_directory(upload_dir, filename, conditional=True, etag=True)
+
+    # Upload names embed a random token, so a URL's bytes never change
+    response.headers["Cache-Control"] = _IMAGE_CACHE_CONTROL
+    return response
@@ -7,10 +7,19 @@ Routes:
   GET /api/health         – liveness probe
   GET /api/health/ready   – readiness probe (checks DB)
   GET /api/info           – platform metadata
+
+Probes are hit every few seconds by load balancers, so their bodies are
+prebuilt: liveness splices a timestamp into constant bytes, platform info is
+serialised once per (config) combination, and the readiness DB check is
+reused for READINESS_CACHE_S.
 """
 
+import sys
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
+import flask
 from flask import Blueprint, current_app, jsonify
 
 from app import db
@@ -19,15 +28,37 @@ health_bp = Blueprint("health", __name__)
 
 _START_TIME = datetime.now(timezone.utc)
 
+_LIVE_PREFIX = b'{"status":"ok","service":"gruha-alankara-api","time":"'
+_LIVE_SUFFIX = b'"}'
+
+READINESS_CACHE_S = 1.0
+_db_check: tuple[float, str] = (float("-inf"), "error")   # (monotonic time, status)
+
 
 @health_bp.get("/health")
 def liveness():
     """Kubernetes/Docker liveness probe – always returns 200 if process is alive."""
-    return jsonify({
-        "status":  "ok",
-        "service": "gruha-alankara-api",
-        "time":    datetime.now(timezone.utc).isoformat(),
-    }), 200
+    now = datetime.now(timezone.utc).isoformat().encode("ascii")
+    return current_app.response_class(
+        _LIVE_PREFIX + now + _LIVE_SUFFIX, status=200, mimetype="application/json"
+    )
+
+
+def _database_status() -> str:
+    """Run SELECT 1 at most once per READINESS_CACHE_S; burst probes share the result."""
+    global _db_check
+    checked_at, status = _db_check
+    now = time.monotonic()
+    if now - checked_at < READINESS_CACHE_S:
+        return status
+    try:
+        db.session.execute(db.text("SELECT 1"))
+        status = "ok"
+    except Exception as e:
+        current_app.logger.error("DB health check failed: %s", e)
+        status = "error"
+    _db_check = (now, status)
+    return status
 
 
 @health_bp.get("/health/ready")
@@ -36,12 +67,7 @@ def readiness():
     Readiness probe – checks database connectivity.
     Returns 200 if ready to serve, 503 if degraded.
     """
-    try:
-        db.session.execute(db.text("SELECT 1"))
-        db_status = "ok"
-    except Exception as e:
-        current_app.logger.error("DB health check failed: %s", e)
-        db_status = "error"
+    db_status = _database_status()
 
     ready = db_status == "ok"
     uptime_s = (datetime.now(timezone.utc) - _START_TIME).total_seconds()
@@ -54,18 +80,16 @@ def readiness():
     return jsonify(payload), 200 if ready else 503
 
 
-@health_bp.get("/info")
-def platform_info():
-    """Return non-sensitive platform metadata."""
-    import sys
-    import flask
-    return jsonify({
+@lru_cache(maxsize=8)
+def _platform_info_body(ai_mock: bool, environment: str) -> bytes:
+    """Serialised /api/info body; only the config-derived fields vary."""
+    return current_app.json.dumps({
         "platform":    "Gruha Alankara AI Interior Design",
         "version":     "2.0.0",
         "python":      sys.version.split()[0],
         "flask":       flask.__version__,
-        "ai_mock":     current_app.config.get("AI_USE_MOCK", True),
-        "environment": current_app.env if hasattr(current_app, "env") else "unknown",
+        "ai_mock":     ai_mock,
+        "environment": environment,
         "docs":        "/api/info",
         "endpoints": {
             "auth":    "/api/auth",
@@ -73,4 +97,14 @@ def platform_info():
             "voice":   "/api/voice",
             "booking": "/api/booking",
         },
-    }), 200
+    }).encode("utf-8")
+
+
+@health_bp.get("/info")
+def platform_info():
+    """Return non-sensitive platform metadata."""
+    body = _platform_info_body(
+        current_app.config.get("AI_USE_MOCK", True),
+        current_app.env if hasattr(current_app, "env") else "unknown",
+    )
+    return current_app.response_class(body, status=200, mimetype="application/json")
@@ -5,26 +5,42 @@ Gruha Alankara – Security Utilities
 
 Provides:
   • File upload validation (extension, size, MIME sniffing)
-  • Secure filename generation
+  • Secure filename generation + HMAC-signed image URLs
+  • Upload streaming (file parts spooled straight into UPLOAD_FOLDER)
   • Input sanitisation helpers
-  • API response helpers
+  • API response helpers (+ orjson-backed Flask JSON provider)
+  • Query helpers (pagination, relaxed-durability commit)
   • Decorators: login_required_api, admin_required
 """
 
+import base64
+import binascii
 import hashlib
 import hmac
+import io
 import logging
 import mimetypes
 import os
 import re
-import uuid
+import secrets
+import string
+import tempfile
+import time
+from datetime import date, datetime
 from functools import wraps
 from typing import Callable
 
-from flask import current_app, jsonify, request
+from flask import Request, current_app, g, has_app_context, jsonify, make_response, request
+from flask.json.provider import DefaultJSONProvider
 from flask_login import current_user
+from sqlalchemy import and_, func, or_, text, update
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is used without it
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -38,17 +54,34 @@ ALLOWED_IMAGE_MIMES = {
     "heic": "image/heic",
 }
 
-MAGIC_BYTES: dict[bytes, str] = {
-    b"\xff\xd8\xff":  "image/jpeg",
-    b"\x89PNG\r\n":   "image/png",
-    b"RIFF":          "image/webp",   # RIFF….WEBP
-    b"\x00\x00\x00":  "image/heic",  # simplified check
+# Keyed on header[:4] → (MIME, (offset, bytes) that must also match there)
+MAGIC_BYTES: dict[bytes, tuple[str, tuple[int, bytes]]] = {
+    b"\x89PNG": ("image/png",  (4, b"\r\n")),
+    b"RIFF":    ("image/webp", (8, b"WEBP")),      # RIFF….WEBP
 }
+JPEG_SOI   = b"\xff\xd8\xff"                           # any APPn/DQT marker follows
+HEIC_BRANDS = frozenset({b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1"})  # ftyp box
+MAGIC_HEADER_LEN = 12
 
-# Compiled sanitisation patterns
+# Compiled sanitisation / validation patterns
 _RE_STRIP_TAGS  = re.compile(r"<[^>]+>")
-_RE_WHITESPACE  = re.compile(r"\s+")
-_RE_SAFE_NAME   = re.compile(r"[^a-zA-Z0-9_\-]")
+_RE_EMAIL       = re.compile(r"^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$")
+
+# Deletes NUL and the other non-whitespace C0 controls plus DEL; whitespace
+# controls (\t \n \r \v \f \x1c-\x1f) are left for str.split() to collapse.
+_CTRL_TABLE = str.maketrans({
+    c: None for c in map(chr, [*range(32), 127]) if not c.isspace()
+})
+
+# ASCII → '_' for everything but [A-Za-z0-9_-] (secure_filename output is ASCII)
+_SAFE_NAME_TABLE = str.maketrans({
+    c: "_" for c in map(chr, range(128))
+    if not (c.isascii() and (c.isalnum() or c in "_-"))
+})
+
+# Password character classes, checked against set(password) in one pass
+_PW_UPPER    = frozenset(string.ascii_uppercase)
+_PW_SPECIAL  = frozenset(string.punctuation)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -80,10 +113,7 @@ def validate_image_file(file_storage) -> tuple[bool, str]:
         allowed = ", ".join(ALLOWED_IMAGE_MIMES.keys())
         return False, f"File type not allowed. Permitted: {allowed}."
 
-    # Check content length via seek/tell
-    file_storage.seek(0, os.SEEK_END)
-    size_bytes = file_storage.tell()
-    file_storage.seek(0)
+    size_bytes, header = _upload_size_and_header(file_storage.stream)
 
     max_bytes = current_app.config.get("MAX_CONTENT_LENGTH", 10 * 1024 * 1024)
     if size_bytes > max_bytes:
@@ -94,11 +124,11 @@ def validate_image_file(file_storage) -> tuple[bool, str]:
         return False, "File is empty."
 
     # Magic-byte verification (prevent extension spoofing)
-    header = file_storage.read(16)
-    file_storage.seek(0)
-
     detected = _detect_mime(header)
-    if detected and not _mime_matches_extension(detected, filename):
+    if detected is None:
+        logger.warning("Unrecognised image content: filename=%s — rejecting upload.", filename)
+        return False, "File content is not a recognised image. Upload rejected."
+    if not _mime_matches_extension(detected, filename):
         logger.warning(
             "MIME mismatch: filename=%s detected=%s — rejecting upload.", filename, detected
         )
@@ -107,14 +137,42 @@ def validate_image_file(file_storage) -> tuple[bool, str]:
     return True, ""
 
 
+def _upload_size_and_header(stream) -> tuple[int, bytes]:
+    """
+    Size and first MAGIC_HEADER_LEN bytes of an uploaded part.
+
+    Parts spooled to a real file (see UploadRequest) are answered with one
+    fstat and one pread, leaving the file position untouched; in-memory
+    spools fall back to seek/tell/read.
+    """
+    if not isinstance(stream, tempfile.SpooledTemporaryFile):
+        try:
+            fd = stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fd = None
+        if fd is not None:
+            stream.flush()
+            return os.fstat(fd).st_size, os.pread(fd, MAGIC_HEADER_LEN, 0)
+
+    stream.seek(0, os.SEEK_END)
+    size_bytes = stream.tell()
+    stream.seek(0)
+    header = stream.read(MAGIC_HEADER_LEN)
+    stream.seek(0)
+    return size_bytes, header
+
+
 def _detect_mime(header: bytes) -> str | None:
-    """Detect MIME type from file header magic bytes."""
-    for magic, mime in MAGIC_BYTES.items():
-        if header.startswith(magic):
-            # Special case: RIFF files need 'WEBP' at offset 8
-            if magic == b"RIFF" and header[8:12] != b"WEBP":
-                continue
-            return mime
+    """Detect MIME type from the first MAGIC_HEADER_LEN bytes of a file."""
+    if header[:3] == JPEG_SOI:
+        return "image/jpeg"
+    entry = MAGIC_BYTES.get(header[:4])
+    if entry is not None:
+        mime, (offset, tail) = entry
+        return mime if header[offset:offset + len(tail)] == tail else None
+    # ISO-BMFF: 4-byte box size, then 'ftyp' and the major brand
+    if header[4:8] == b"ftyp" and header[8:12] in HEIC_BRANDS:
+        return "image/heic"
     return None
 
 
@@ -132,7 +190,7 @@ def generate_secure_filename(original_filename: str, user_id: int | None = None)
     """
     Generate a collision-safe filename that preserves the original extension.
 
-    Format: {user_id}_{uuid4}_{sanitised_original}.{ext}
+    Format: {user_id}_{12 random hex}_{sanitised_original}.{ext}
 
     Args:
         original_filename: The uploaded file's original name.
@@ -144,21 +202,116 @@ def generate_secure_filename(original_filename: str, user_id: int | None = None)
     safe_original = secure_filename(original_filename)
     ext = safe_original.rsplit(".", 1)[-1].lower() if "." in safe_original else "bin"
     stem = safe_original.rsplit(".", 1)[0] if "." in safe_original else safe_original
-    stem = _RE_SAFE_NAME.sub("_", stem)[:30]          # max 30 chars from original
+    stem = stem.translate(_SAFE_NAME_TABLE)[:30]      # max 30 chars from original
     uid  = f"{user_id}_" if user_id else ""
-    return f"{uid}{uuid.uuid4().hex[:12]}_{stem}.{ext}"
+    return f"{uid}{secrets.token_hex(6)}_{stem}.{ext}"
+
+
+def _image_signature(filename: str, user_id: int, expires: int) -> str:
+    message = f"{user_id}:{filename}:{expires}".encode("utf-8")
+    key = current_app.config["SECRET_KEY"].encode("utf-8")
+    return hmac.new(key, message, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_image_url(filename: str, user_id: int) -> str:
+    """
+    Build an image URL carrying an expiring HMAC signature, so serve_image
+    can authorise the owner without a database lookup.
+    """
+    expires = int(time.time()) + current_app.config.get("IMAGE_URL_TTL", 24 * 3600)
+    sig = _image_signature(filename, user_id, expires)
+    return f"/api/design/images/{filename}?u={user_id}&e={expires}&s={sig}"
+
+
+def verify_image_signature(filename: str, user_id: int, expires: int, sig: str) -> bool:
+    """Constant-time check of a sign_image_url() signature and its expiry."""
+    if expires < time.time():
+        return False
+    # Compare bytes: compare_digest rejects str arguments with non-ASCII
+    # characters with a TypeError, and ?s= is attacker-controlled.
+    expected = _image_signature(filename, user_id, expires).encode("ascii")
+    return hmac.compare_digest(expected, sig.encode("utf-8", "surrogateescape"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UPLOAD STREAMING
+# ─────────────────────────────────────────────────────────────────────────────
+class UploadRequest(Request):
+    """
+    Request class whose multipart file parts stream straight into a hidden
+    temp file inside UPLOAD_FOLDER instead of Werkzeug's in-memory/anonymous
+    spool. persist_upload() can then rename the part into place rather than
+    copying it a second time. Unclaimed spool files are removed on close().
+    """
+
+    def _get_file_stream(self, total_content_length, content_type,
+                         filename=None, content_length=None):
+        upload_dir = current_app.config.get("UPLOAD_FOLDER") if has_app_context() else None
+        if not filename or not upload_dir:
+            return super()._get_file_stream(
+                total_content_length, content_type, filename, content_length
+            )
+        os.makedirs(upload_dir, exist_ok=True)
+        spool = tempfile.NamedTemporaryFile("wb+", dir=upload_dir, prefix=".upload-", delete=False)
+        self.__dict__.setdefault("_upload_spools", []).append(spool.name)
+        return spool
+
+    def close(self) -> None:
+        super().close()
+        for path in self.__dict__.get("_upload_spools", ()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:   # already renamed into place
+                pass
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import: os.umask() can only be queried by setting it, which
+# is not safe to do from concurrent request threads.
+_UPLOAD_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def persist_upload(file_storage, dest_path: str) -> int:
+    """
+    Move an uploaded file to dest_path and return its size in bytes.
+
+    A part spooled by UploadRequest into the same directory is flushed and
+    renamed (no second write); anything else falls back to FileStorage.save.
+    Renamed spools get the umask-derived mode a fresh file would have, not
+    NamedTemporaryFile's 0600, so a front-end server (X-Accel-Redirect) can
+    still read them.
+    """
+    stream = file_storage.stream
+    spool_path = getattr(stream, "name", None)
+    if (isinstance(spool_path, str)
+            and os.path.dirname(os.path.abspath(spool_path))
+            == os.path.dirname(os.path.abspath(dest_path))):
+        stream.flush()
+        size_bytes = os.fstat(stream.fileno()).st_size
+        os.chmod(spool_path, _UPLOAD_FILE_MODE)
+        os.replace(spool_path, dest_path)
+        return size_bytes
+
+    file_storage.save(dest_path)
+    return os.path.getsize(dest_path)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # INPUT SANITISATION
 # ─────────────────────────────────────────────────────────────────────────────
 def sanitise_text(value: str, max_length: int = 500) -> str:
-    """Strip HTML tags, collapse whitespace, and truncate."""
+    """Strip HTML tags and control characters, collapse whitespace, and truncate."""
     if not isinstance(value, str):
         return ""
-    value = _RE_STRIP_TAGS.sub("", value)
-    value = _RE_WHITESPACE.sub(" ", value).strip()
-    return value[:max_length]
+    value = value.translate(_CTRL_TABLE)   # NUL is also rejected by PostgreSQL text
+    if "<" in value:
+        value = _RE_STRIP_TAGS.sub("", value)
+    return " ".join(value.split())[:max_length]
 
 
 def sanitise_email(email: str) -> str:
@@ -168,8 +321,7 @@ def sanitise_email(email: str) -> str:
 
 def is_valid_email(email: str) -> bool:
     """Simple RFC-5322 email format check."""
-    pattern = re.compile(r"^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$")
-    return bool(pattern.match(email))
+    return bool(_RE_EMAIL.match(email))
 
 
 def is_strong_password(password: str) -> tuple[bool, str]:
@@ -187,11 +339,12 @@ def is_strong_password(password: str) -> tuple[bool, str]:
     """
     if len(password) < 8:
         return False, "Password must be at least 8 characters long."
-    if not re.search(r"[A-Z]", password):
+    chars = set(password)
+    if chars.isdisjoint(_PW_UPPER):
         return False, "Password must include at least one uppercase letter."
-    if not re.search(r"\d", password):
+    if not any(c.isdecimal() for c in chars):
         return False, "Password must include at least one digit."
-    if not re.search(r"[!@#$%^&*()_\-+=\[\]{};:'\",.<>?/\\|`~]", password):
+    if chars.isdisjoint(_PW_SPECIAL):
         return False, "Password must include at least one special character."
     return True, ""
 
@@ -223,26 +376,169 @@ def api_error(message: str,
     return jsonify(payload), status_code
 
 
-def paginate_query(query, page: int = 1, per_page: int = 20) -> dict:
+def records_to_columns(records: list[dict]) -> dict[str, list]:
+    """
+    Convert a list of same-shaped dicts to struct-of-arrays form:
+    [{"a": 1, "b": 2}, {"a": 3, "b": 4}] → {"a": [1, 3], "b": [2, 4]}
+    """
+    if not records:
+        return {}
+    return {key: [r.get(key) for r in records] for key in records[0]}
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (C extension, several times faster
+    than the stdlib). Falls back to the default provider when orjson is not
+    installed or stdlib-only keyword arguments are passed.
+
+    Any datetime that reaches the provider unformatted is written as ISO
+    8601 by orjson, and the fallback does the same instead of Flask's
+    HTTP-date format. Model to_dict() methods still return isoformat()
+    strings, so their output is plain JSON-safe data for any consumer.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_dumps(self, obj) -> bytes:
+        # numpy scalars/arrays can surface in AI results; encode them natively
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._orjson_dumps(obj), mimetype=self.mimetype)
+
+
+def commit_relaxed(session) -> None:
+    """
+    Commit a low-stakes session-lifecycle write (profile edits, password
+    change, cancellations) without waiting on synchronous standbys.
+
+    On PostgreSQL this issues SET LOCAL synchronous_commit = 'local' inside
+    the transaction first, so the commit returns once the primary has
+    flushed WAL. Other dialects commit normally.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SET LOCAL synchronous_commit = 'local'"))
+    session.commit()
+
+
+def paginate_query(query, page: int = 1, per_page: int = 20, count: bool = True,
+                   load_options=None, keyset: bool = False) -> dict:
     """
     Paginate a SQLAlchemy query and return a structured pagination dict.
 
+    With count=False the COUNT(*) query is skipped: one extra row is fetched
+    to derive has_next, and 'total' / 'pages' are None.
+
+    load_options are applied with query.options() before fetching — pass the
+    selectinload/joinedload/defer options matching what the model's
+    to_dict() reads, so serialising a page stays at a fixed query count.
+
+    With keyset=True (query ordered by created_at DESC, id DESC) the page
+    also carries a next_cursor, so a client can continue with
+    keyset_paginate() from any OFFSET page. The pagination keys are the same
+    as keyset_paginate()'s; whichever mode does not apply is None.
+
+    Returns:
+        Dict with 'items', 'pagination' keys.
+    """
+    per_page = min(per_page, current_app.config.get("MAX_PAGE_SIZE", 100))
+    if load_options:
+        query = query.options(*load_options)
+    if count:
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        rows, has_next = pagination.items, pagination.has_next
+        total, pages = pagination.total, pagination.pages
+    else:
+        rows = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        total = pages = None
+
+    next_cursor = None
+    if keyset and has_next and rows:
+        next_cursor = _encode_keyset_cursor(rows[-1].created_at, rows[-1].id)
+    return {
+        "items": [item.to_dict() for item in rows],
+        "pagination": {
+            "page":        page,
+            "per_page":    per_page,
+            "total":       total,
+            "pages":       pages,
+            "has_next":    has_next,
+            "has_prev":    page > 1,
+            "next_page":   page + 1 if has_next else None,
+            "prev_page":   page - 1 if page > 1 else None,
+            "next_cursor": next_cursor,
+        },
+    }
+
+
+def keyset_paginate(query, model, per_page: int = 20,
+                    after_created_at: datetime | None = None,
+                    after_id: int | None = None,
+                    load_options=None) -> dict:
+    """
+    Keyset ("seek") pagination over (created_at DESC, id DESC).
+
+    Unlike paginate_query there is no OFFSET and no COUNT(*): rows are read
+    straight off a (user_id, created_at DESC) index, fetching one extra row
+    to learn whether another page exists. The pagination dict has the same
+    keys as paginate_query()'s, with the OFFSET-only ones (page, total, pages,
+    next_page, prev_page) set to None. next_cursor is an opaque URL-safe
+    token; pass it back as ?cursor= (read with get_keyset_cursor()) to
+    continue. load_options work as in paginate_query.
+
     Returns:
         Dict with 'items', 'pagination' keys.
     """
     per_page = min(per_page, current_app.config.get("MAX_PAGE_SIZE", 100))
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if load_options:
+        query = query.options(*load_options)
+    if after_created_at is not None and after_id is not None:
+        query = query.filter(or_(
+            model.created_at < after_created_at,
+            and_(model.created_at == after_created_at, model.id < after_id),
+        ))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = _encode_keyset_cursor(last.created_at, last.id)
     return {
-        "items": [item.to_dict() for item in pagination.items],
+        "items": [item.to_dict() for item in rows],
         "pagination": {
-            "page":       pagination.page,
-            "per_page":   pagination.per_page,
-            "total":      pagination.total,
-            "pages":      pagination.pages,
-            "has_next":   pagination.has_next,
-            "has_prev":   pagination.has_prev,
-            "next_page":  pagination.next_num,
-            "prev_page":  pagination.prev_num,
+            "page":        None,
+            "per_page":    per_page,
+            "total":       None,
+            "pages":       None,
+            "has_next":    has_next,
+            "has_prev":    after_id is not None,
+            "next_page":   None,
+            "prev_page":   None,
+            "next_cursor": next_cursor,
         },
     }
 
@@ -278,19 +574,59 @@ def admin_required(f: Callable) -> Callable:
 
 
 def ai_quota_required(f: Callable) -> Callable:
-    """Decorator that checks the user still has AI analysis quota remaining."""
+    """
+    Decorator that atomically reserves one AI analysis from the user's quota.
+
+    The reservation is a single conditional UPDATE ... RETURNING, so two
+    concurrent requests cannot both spend the last unit. The remaining
+    quota is exposed as g.quota_remaining for the view's response; if the
+    view answers with an error status or raises, the reservation is released.
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
         if not current_user.is_authenticated:
             return api_error("Authentication required.", 401)
-        if not current_user.has_ai_quota:
+
+        from app import db
+        from app.models.user import User
+
+        used = func.coalesce(User.ai_analyses_used, 0)
+        remaining = db.session.execute(
+            update(User)
+            .where(User.id == current_user.id, used < User.ai_analyses_limit)
+            .values(ai_analyses_used=used + 1)
+            .returning(User.ai_analyses_limit - User.ai_analyses_used)
+        ).scalar_one_or_none()
+        db.session.commit()
+        if remaining is None:
             return api_error(
                 f"AI analysis quota exhausted. You've used all "
                 f"{current_user.ai_analyses_limit} analyses this period. "
                 "Upgrade to Pro for unlimited access.",
                 429,
             )
-        return f(*args, **kwargs)
+        g.quota_remaining = max(0, remaining)
+
+        def release() -> None:
+            db.session.rollback()
+            db.session.execute(
+                update(User)
+                .where(User.id == current_user.id, used > 0)
+                .values(ai_analyses_used=used - 1)
+            )
+            db.session.commit()
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            try:
+                release()
+            except Exception:   # keep the view's error, not the refund's
+                logger.exception("Could not release AI quota for user=%s", current_user.id)
+            raise
+        if response.status_code >= 400:
+            release()
+        return response
     return decorated
 
 
@@ -305,14 +641,37 @@ def get_json_body(**required_fields) -> tuple[dict | None, str | None]:
         data, err = get_json_body(email=str, password=str)
         if err: return api_error(err)
 
+    At most MAX_JSON_BODY bytes are read, whatever Content-Length says (or
+    whether it is sent at all, e.g. chunked bodies).
+
+    The body is read straight off request.stream and not cached: after this
+    call request.get_json() / request.get_data() see an empty body, so use
+    the returned dict instead.
+
     Returns:
         (data_dict, None) on success, (None, error_str) on failure.
     """
     if not request.is_json:
         return None, "Request must have Content-Type: application/json."
 
-    data = request.get_json(silent=True)
-    if data is None:
+    # Reject oversize bodies from the header alone, before reading them
+    max_bytes = current_app.config.get("MAX_JSON_BODY", 64 * 1024)
+    too_large = f"JSON body too large (max {max_bytes // 1024} KB)."
+    if (request.content_length or 0) > max_bytes:
+        return None, too_large
+
+    # The header may be absent or wrong: cap the bytes actually read, one
+    # past the limit so an oversize body is detected without buffering it.
+    # Parsed directly with the app's JSON provider (orjson when installed)
+    # rather than via request.get_json(), skipping its mimetype re-check.
+    raw = request.stream.read(max_bytes + 1)
+    if len(raw) > max_bytes:
+        return None, too_large
+    try:
+        data = current_app.json.loads(raw) if raw else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
         return None, "Invalid or empty JSON body."
 
     missing = [field for field in required_fields if field not in data or data[field] is None]
@@ -322,6 +681,41 @@ def get_json_body(**required_fields) -> tuple[dict | None, str | None]:
     return data, None
 
 
+def _encode_keyset_cursor(created_at: datetime, row_id: int) -> str:
+    """Pack a (created_at, id) seek position into an unpadded base64url token."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode_keyset_cursor(token: str) -> tuple[datetime, int]:
+    """Inverse of _encode_keyset_cursor(); raises ValueError on any malformed token."""
+    try:
+        raw = base64.b64decode(token + "=" * (-len(token) % 4), altchars=b"-_", validate=True)
+    except binascii.Error as e:
+        raise ValueError(str(e)) from None
+    created_at, sep, row_id = raw.decode("utf-8").partition("|")
+    if not sep or not row_id.isdigit():
+        raise ValueError("cursor id must be a non-negative integer")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def get_keyset_cursor() -> tuple[tuple[datetime, int] | None, str | None]:
+    """
+    Read a keyset_paginate() cursor token from ?cursor=.
+
+    Returns:
+        ((after_created_at, after_id) or None when absent, None) on success,
+        (None, error_str) when the token is malformed.
+    """
+    token = request.args.get("cursor", "").strip()
+    if not token:
+        return None, None
+    try:
+        return _decode_keyset_cursor(token), None
+    except ValueError:
+        return None, "Invalid cursor. Pass pagination.next_cursor from a previous page unchanged."
+
+
 def get_client_ip() -> str:
     """Extract real client IP, respecting X-Forwarded-For in proxied setups."""
     forwarded_for = request.headers.get("X-Forwarded-For")
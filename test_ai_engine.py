@@ -4,19 +4,59 @@ tests/test_ai_engine.py
 Tests for the AI engine – mock generation, TTS, and VoiceAgent.
 """
 
+import io
 import os
 import pytest
 import tempfile
 from PIL import Image
 
+ALL_STYLES = ["Modern", "Traditional", "Minimalist", "Bohemian", "Haveli"]
+
+
+@pytest.fixture(scope="session")
+def sample_jpeg_bytes():
+    """Encode the test JPEG once per session; encoding dominates fixture cost."""
+    try:
+        import numpy as np
+    except ImportError:   # requirements-minimal.txt installs Pillow without NumPy
+        img = Image.new("RGB", (640, 480), color=(180, 160, 140))
+    else:
+        img = Image.fromarray(np.full((480, 640, 3), (180, 160, 140), dtype=np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=75, optimize=False)
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="session")
+def all_designs(tmp_path_factory, sample_jpeg_bytes):
+    """One mock design per style, generated once for the style assertions."""
+    from ai_engine import generate_design
+    img_path = tmp_path_factory.mktemp("imgs") / "test_room.jpg"
+    img_path.write_bytes(sample_jpeg_bytes)
+    return {
+        style: generate_design(str(img_path), style=style, use_mock=True)
+        for style in ALL_STYLES
+    }
+
+
+@pytest.fixture(scope="session")
+def voice_agent():
+    from ai_engine import get_voice_agent
+    return get_voice_agent()
+
+
+@pytest.fixture(scope="session")
+def tts_engine():
+    from ai_engine import get_tts_engine
+    return get_tts_engine()
+
 
 @pytest.fixture
-def sample_image(tmp_path):
+def sample_image(tmp_path, sample_jpeg_bytes):
     """Create a minimal valid JPEG image for testing."""
-    img_path = str(tmp_path / "test_room.jpg")
-    img = Image.new("RGB", (640, 480), color=(180, 160, 140))
-    img.save(img_path, "JPEG")
-    return img_path
+    img_path = tmp_path / "test_room.jpg"
+    img_path.write_bytes(sample_jpeg_bytes)
+    return str(img_path)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -78,48 +118,119 @@ class TestGenerateDesign:
         result = generate_design(sample_image, dimensions=dims, use_mock=True)
         assert result["project_meta"]["room_area_sqft"] == 180.0
 
-    @pytest.mark.parametrize("style", ["Modern", "Traditional", "Minimalist", "Bohemian", "Haveli"])
-    def test_all_styles(self, sample_image, style):
+    def test_repeat_request_served_from_cache(self, sample_image):
         from ai_engine import generate_design
-        result = generate_design(sample_image, style=style, use_mock=True)
-        assert result["project_meta"]["style"] == style
+        first = generate_design(sample_image, style="Haveli", use_mock=True)
+        second = generate_design(sample_image, style="Haveli", use_mock=True)
+        assert second["furniture"] == first["furniture"]
+        assert second["project_meta"]["analysis_id"] != first["project_meta"]["analysis_id"]
+        assert first["project_meta"]["from_cache"] is None
+        assert second["project_meta"]["from_cache"] is not None
+
+    def test_cache_hit_matches_a_fresh_run(self, tmp_path, sample_jpeg_bytes):
+        """Same bytes under paths of different length seed the mock differently."""
+        from ai_engine import _mock_generate, clear_design_cache, generate_design
+        short = tmp_path / "a.jpg"
+        long_ = tmp_path / "a_much_longer_filename.jpg"
+        for path in (short, long_):
+            path.write_bytes(sample_jpeg_bytes)
+
+        clear_design_cache()
+        for path in (short, long_):
+            result = generate_design(str(path), style="Modern", use_mock=True)
+            fresh = _mock_generate(str(path), "Modern")
+            assert result["furniture"] == fresh["furniture"]
+            assert result["project_meta"]["confidence"] == fresh["project_meta"]["confidence"]
+
+    @pytest.mark.parametrize("raw", [b"not json", b"[1, 2]", b'{"cached_at": 1}',
+                                     b'{"cached_at": 1, "result": {"project_meta": 3}}'])
+    def test_corrupt_shared_cache_entry_is_a_miss(self, sample_image, monkeypatch, raw):
+        import ai_engine
+
+        class FakeRedis:
+            def get(self, key):
+                return raw
+
+            def setex(self, key, ttl, value):
+                pass
+
+        monkeypatch.setattr(ai_engine, "_get_design_redis", lambda: FakeRedis())
+        ai_engine.clear_design_cache()
+        result = ai_engine.generate_design(sample_image, style="Modern", use_mock=True)
+        assert result["project_meta"]["from_cache"] is None
+
+    def test_mock_generate_is_thread_safe(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from ai_engine import _mock_generate, STYLE_KNOWLEDGE
+
+        styles = list(STYLE_KNOWLEDGE)
+        inputs = [(f"/uploads/{'x' * i}.jpg", styles[i % len(styles)]) for i in range(16)]
+        reference = [_mock_generate(p, s)["project_meta"]["confidence"] for p, s in inputs]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda args: _mock_generate(*args), inputs * 8))
+
+        confidences = [r["project_meta"]["confidence"] for r in results]
+        assert confidences == reference * 8
+
+    @pytest.mark.parametrize("style", ALL_STYLES)
+    def test_all_styles(self, all_designs, style):
+        assert all_designs[style]["project_meta"]["style"] == style
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CAPTION BATCHER
+# ─────────────────────────────────────────────────────────────────────────────
+class TestCaptionBatcher:
+    def test_short_caption_list_fails_the_extra_futures(self, monkeypatch):
+        import ai_engine
+        monkeypatch.setattr(ai_engine, "_caption_images", lambda images: ["a sofa"])
+
+        batcher = ai_engine._CaptionBatcher(window_s=0.5)
+        first, second = batcher.submit("img-1"), batcher.submit("img-2")
+        assert first.result(timeout=5) == "a sofa"
+        with pytest.raises(RuntimeError):
+            second.result(timeout=5)
+
+    def test_unanswered_caption_falls_back_to_mock(self, sample_image, monkeypatch):
+        from concurrent.futures import Future
+        import ai_engine
+
+        class StuckBatcher:
+            def submit(self, image):
+                return Future()
+
+        monkeypatch.setattr(ai_engine, "_caption_batcher", StuckBatcher())
+        monkeypatch.setattr(ai_engine, "_CAPTION_TIMEOUT_S", 0.05)
+        result = ai_engine._real_generate(sample_image, "Modern")
+        assert "image_caption" not in result["project_meta"]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # VOICE AGENT
 # ─────────────────────────────────────────────────────────────────────────────
 class TestVoiceAgent:
-    def test_answer_returns_string(self):
-        from ai_engine import get_voice_agent
-        agent = get_voice_agent()
-        result = agent.answer("What color should I paint my living room?")
+    def test_answer_returns_string(self, voice_agent):
+        result = voice_agent.answer("What color should I paint my living room?")
         assert isinstance(result, str)
         assert len(result) > 5
 
-    def test_vastu_query(self):
-        from ai_engine import get_voice_agent
-        agent = get_voice_agent()
-        result = agent.answer("Tell me about vastu shastra for my home")
+    def test_vastu_query(self, voice_agent):
+        result = voice_agent.answer("Tell me about vastu shastra for my home")
         assert "vastu" in result.lower() or "north" in result.lower() or "east" in result.lower()
 
-    def test_small_room_query(self):
-        from ai_engine import get_voice_agent
-        agent = get_voice_agent()
-        result = agent.answer("How do I design a small room?")
+    def test_small_room_query(self, voice_agent):
+        result = voice_agent.answer("How do I design a small room?")
         assert isinstance(result, str)
         assert len(result) > 10
 
-    def test_greetings_short_query(self):
-        from ai_engine import get_voice_agent
-        agent = get_voice_agent()
-        result = agent.answer("Hi", language="en")
+    def test_greetings_short_query(self, voice_agent):
+        result = voice_agent.answer("Hi", language="en")
         assert isinstance(result, str)
 
     @pytest.mark.parametrize("lang", ["en", "hi", "te"])
-    def test_multilanguage(self, lang):
-        from ai_engine import get_voice_agent
-        agent = get_voice_agent()
-        result = agent.answer("What furniture do you recommend?", language=lang)
+    def test_multilanguage(self, voice_agent, lang):
+        result = voice_agent.answer("What furniture do you recommend?", language=lang)
         assert isinstance(result, str)
 
 
@@ -127,30 +238,24 @@ class TestVoiceAgent:
 # TTS ENGINE
 # ─────────────────────────────────────────────────────────────────────────────
 class TestTTSEngine:
-    def test_synthesize_creates_file(self, tmp_path):
-        from ai_engine import get_tts_engine
-        tts = get_tts_engine()
-        out = tts.synthesize(
+    def test_synthesize_creates_file(self, tts_engine, tmp_path):
+        out = tts_engine.synthesize(
             text="Welcome to Gruha Alankara",
             language="en",
             output_dir=str(tmp_path),
         )
         assert os.path.isfile(out)
 
-    def test_synthesize_hindi(self, tmp_path):
-        from ai_engine import get_tts_engine
-        tts = get_tts_engine()
-        out = tts.synthesize(
+    def test_synthesize_hindi(self, tts_engine, tmp_path):
+        out = tts_engine.synthesize(
             text="नमस्ते गृह अलंकार में आपका स्वागत है",
             language="hi",
             output_dir=str(tmp_path),
         )
         assert os.path.isfile(out)
 
-    def test_synthesize_custom_filename(self, tmp_path):
-        from ai_engine import get_tts_engine
-        tts = get_tts_engine()
-        out = tts.synthesize(
+    def test_synthesize_custom_filename(self, tts_engine, tmp_path):
+        out = tts_engine.synthesize(
             text="Test",
             language="en",
             output_dir=str(tmp_path),
@@ -158,13 +263,19 @@ class TestTTSEngine:
         )
         assert "custom_test" in os.path.basename(out)
 
-    def test_unsupported_language_falls_back(self, tmp_path):
-        from ai_engine import get_tts_engine
-        tts = get_tts_engine()
+    def test_unsupported_language_falls_back(self, tts_engine, tmp_path):
         # Unknown language should fall back to English (no crash)
-        out = tts.synthesize(
+        out = tts_engine.synthesize(
             text="Test text",
             language="zz",  # not a real code
             output_dir=str(tmp_path),
         )
         assert os.path.isfile(out)
+
+    def test_synthesize_async_returns_future(self, tts_engine, tmp_path):
+        future = tts_engine.synthesize_async(
+            text="Async welcome",
+            language="en",
+            output_dir=str(tmp_path),
+        )
+        assert os.path.isfile(future.result(timeout=30))
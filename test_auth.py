@@ -6,32 +6,10 @@ Unit + integration tests for the Authentication API.
 
 import json
 import pytest
-from app import create_app, db as _db
+from app import db as _db
 
 
-@pytest.fixture(scope="session")
-def app():
-    """Create test Flask application."""
-    _app = create_app("testing")
-    with _app.app_context():
-        _db.create_all()
-        yield _app
-        _db.drop_all()
-
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
-
-@pytest.fixture(autouse=True)
-def clean_db(app):
-    """Wipe tables between tests."""
-    with app.app_context():
-        _db.session.remove()
-        for table in reversed(_db.metadata.sorted_tables):
-            _db.session.execute(table.delete())
-        _db.session.commit()
+pytestmark = pytest.mark.usefixtures("clean_db")
 
 
 def post_json(client, url, data):
@@ -112,6 +90,44 @@ class TestLogin:
         })
         assert rv.status_code == 401
 
+    def test_login_upgrades_legacy_hash(self, app, client):
+        from werkzeug.security import generate_password_hash
+        from app.models.user import User
+        self._register(client)
+        user = User.query.filter_by(email="user@test.com").one()
+        user._password_hash = generate_password_hash("Gruha@1234", method="pbkdf2:sha256:500")
+        _db.session.commit()
+
+        rv = post_json(client, "/api/auth/login", {
+            "email": "user@test.com",
+            "password": "Gruha@1234",
+        })
+        assert rv.status_code == 200
+        _db.session.refresh(user)
+        assert user._password_hash.startswith("pbkdf2:sha256:1000$")
+        assert user.check_password("Gruha@1234")
+
+    def test_login_records_last_login(self, client):
+        from sqlalchemy import select
+        from app.api.auth import flush_logins
+        from app.models.user import User
+        self._register(client)
+        flush_logins()
+
+        rv = post_json(client, "/api/auth/login", {
+            "email": "user@test.com",
+            "password": "Gruha@1234",
+        })
+        assert rv.status_code == 200
+        assert rv.get_json()["data"]["last_login_at"] is not None
+
+        flush_logins()                      # the batch writer commits off-request
+        _db.session.remove()
+        stored = _db.session.execute(
+            select(User.last_login_at).where(User.email == "user@test.com")
+        ).scalar_one()
+        assert stored is not None
+
     def test_login_nonexistent_user(self, client):
         rv = post_json(client, "/api/auth/login", {
             "email": "nobody@test.com",
@@ -151,6 +167,14 @@ class TestProfile:
         assert rv.status_code == 200
         assert rv.get_json()["data"]["name"] == "Updated Name"
 
+    def test_to_dict_is_plain_json(self, client):
+        from app.models.user import User
+        self._login(client)
+        data = User.query.filter_by(email="profile@test.com").one().to_dict()
+        assert isinstance(data["created_at"], str)
+        assert json.loads(json.dumps(data)) == data      # no provider needed
+        assert client.get("/api/auth/me").get_json()["data"]["created_at"] == data["created_at"]
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # HEALTH
@@ -0,0 +1,189 @@
+"""
+tests/test_booking.py
+=====================
+Integration tests for the Furniture Booking API.
+"""
+
+import base64
+import re
+from datetime import datetime
+
+import pytest
+
+pytestmark = pytest.mark.usefixtures("clean_db")
+
+IN_STOCK = ["SOF-MOD-001", "SOF-TRD-002", "TBL-MOD-003", "BED-MIN-004", "CHR-BOH-006"]
+
+
+def book(client, furniture_id):
+    rv = client.post("/api/booking/", json={
+        "furniture_id":     furniture_id,
+        "delivery_address": "12 MG Road, Bengaluru 560001",
+    })
+    assert rv.status_code == 201
+    return rv.get_json()["data"]["id"]
+
+
+def list_page(client, **params):
+    rv = client.get("/api/booking/", query_string=params)
+    assert rv.status_code == 200
+    return rv.get_json()["data"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CREATE
+# ─────────────────────────────────────────────────────────────────────────────
+class TestCreateBooking:
+    def test_second_pending_booking_for_same_item_is_409(self, auth_client):
+        first = book(auth_client, "SOF-MOD-001")
+        rv = auth_client.post("/api/booking/", json={
+            "furniture_id":     "sof-mod-001",
+            "delivery_address": "12 MG Road, Bengaluru 560001",
+        })
+        assert rv.status_code == 409
+        assert f"#{first}" in rv.get_json()["error"]
+
+    def test_other_items_are_not_duplicates(self, auth_client):
+        book(auth_client, "SOF-MOD-001")
+        book(auth_client, "SOF-TRD-002")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LIST / PAGINATION
+# ─────────────────────────────────────────────────────────────────────────────
+class TestListBookings:
+    @pytest.fixture
+    def booking_ids(self, auth_client):
+        return [book(auth_client, fid) for fid in IN_STOCK]
+
+    @staticmethod
+    def same_created_at(user_id):
+        from sqlalchemy import update
+        from app import db
+        from app.models.booking import FurnitureBooking
+        db.session.execute(
+            update(FurnitureBooking).where(FurnitureBooking.user_id == user_id)
+            .values(created_at=datetime(2026, 1, 1, 12, 0, 0))
+        )
+        db.session.commit()
+
+    @staticmethod
+    def walk(client, per_page):
+        pages, params = [], {"per_page": per_page}
+        while True:
+            data = list_page(client, **params)
+            pages.append([item["id"] for item in data["items"]])
+            cursor = data["pagination"]["next_cursor"]
+            if cursor is None:
+                assert data["pagination"]["has_next"] is False
+                return pages
+            assert data["pagination"]["has_next"] is True
+            params = {"per_page": per_page, "cursor": cursor}
+
+    def test_first_page_keeps_offset_totals(self, auth_client, booking_ids):
+        data = list_page(auth_client, per_page=2)
+        pagination = data["pagination"]
+        assert [item["id"] for item in data["items"]] == booking_ids[::-1][:2]
+        assert pagination["page"] == 1
+        assert pagination["total"] == len(booking_ids)
+        assert pagination["pages"] == 3
+        assert pagination["has_next"] is True
+        assert re.fullmatch(r"[A-Za-z0-9_-]+", pagination["next_cursor"])   # opaque, URL-safe
+
+    def test_same_pagination_keys_in_both_modes(self, auth_client, booking_ids):
+        first  = list_page(auth_client, per_page=2)["pagination"]
+        second = list_page(auth_client, per_page=2, cursor=first["next_cursor"])["pagination"]
+        assert set(first) == set(second)
+        assert second["page"] is None and second["total"] is None
+        assert second["has_prev"] is True
+
+    def test_walk_pages_by_cursor(self, auth_client, booking_ids):
+        pages = self.walk(auth_client, per_page=2)
+        assert [len(p) for p in pages] == [2, 2, 1]
+        assert sum(pages, []) == booking_ids[::-1]
+
+    def test_ties_on_created_at_are_not_skipped_or_repeated(self, auth_client, booking_ids):
+        self.same_created_at(auth_client.user_id)
+        pages = self.walk(auth_client, per_page=2)
+        assert sum(pages, []) == sorted(booking_ids, reverse=True)
+
+    def test_exact_page_has_no_next(self, auth_client, booking_ids):
+        data = list_page(auth_client, per_page=len(booking_ids))
+        assert len(data["items"]) == len(booking_ids)
+        assert data["pagination"]["has_next"] is False
+        assert data["pagination"]["next_cursor"] is None
+
+    @pytest.mark.parametrize("raw", [b"yesterday|3", b"2026-01-01T00:00:00|x", b"2026-01-01T00:00:00"])
+    def test_malformed_cursor_is_400(self, auth_client, raw):
+        token = base64.urlsafe_b64encode(raw).decode()
+        rv = auth_client.get("/api/booking/", query_string={"cursor": token})
+        assert rv.status_code == 400
+
+    def test_non_base64_cursor_is_400(self, auth_client):
+        rv = auth_client.get("/api/booking/", query_string={"cursor": "not a cursor!"})
+        assert rv.status_code == 400
+
+    def test_offset_page_without_count_uses_extra_row(self, auth_client, booking_ids):
+        data = list_page(auth_client, page=2, per_page=2, count=0)
+        pagination = data["pagination"]
+        assert [item["id"] for item in data["items"]] == booking_ids[::-1][2:4]
+        assert pagination["has_next"] is True
+        assert pagination["next_page"] == 3
+        assert pagination["total"] is None and pagination["pages"] is None
+
+        last = list_page(auth_client, page=3, per_page=2, count=0)["pagination"]
+        assert last["has_next"] is False
+        assert last["next_page"] is None
+        assert last["next_cursor"] is None
+
+    def test_later_offset_page_keeps_totals(self, auth_client, booking_ids):
+        pagination = list_page(auth_client, page=2, per_page=2)["pagination"]
+        assert pagination["page"] == 2
+        assert pagination["total"] == len(booking_ids)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CATALOGUE
+# ─────────────────────────────────────────────────────────────────────────────
+class TestCatalogue:
+    def test_keeps_json_envelope(self, client):
+        rv = client.get("/api/booking/catalogue", query_string={"style": "Modern"})
+        assert rv.status_code == 200
+        assert rv.mimetype == "application/json"
+        body = rv.get_json()
+        assert body["success"] is True
+        assert body["data"]["filters"] == {"style": "Modern", "category": ""}
+        assert body["data"]["total"] == len(body["data"]["catalogue"]) > 0
+        assert {item["style"] for item in body["data"]["catalogue"]} == {"Modern"}
+
+    def test_returns_strong_etag(self, client):
+        rv = client.get("/api/booking/catalogue")
+        etag, weak = rv.get_etag()
+        assert etag and not weak
+        assert "max-age" in rv.headers["Cache-Control"]
+        assert client.get("/api/booking/catalogue").get_etag() == (etag, weak)
+
+    def test_etag_differs_per_filter(self, client):
+        modern  = client.get("/api/booking/catalogue", query_string={"style": "Modern"})
+        seating = client.get("/api/booking/catalogue", query_string={"category": "Seating"})
+        assert modern.get_etag()[0] != seating.get_etag()[0]
+
+    def test_if_none_match_is_304(self, client):
+        etag = client.get("/api/booking/catalogue").get_etag()[0]
+        rv = client.get("/api/booking/catalogue", headers={"If-None-Match": f'"{etag}"'})
+        assert rv.status_code == 304
+        assert rv.data == b""
+
+        rv = client.get("/api/booking/catalogue", headers={"If-None-Match": '"stale"'})
+        assert rv.status_code == 200
+
+    def test_exempt_from_default_rate_limit(self, auth_client, monkeypatch):
+        from app import limiter
+        monkeypatch.setattr(limiter, "enabled", True)
+        try:
+            catalogue = [auth_client.get("/api/booking/catalogue").status_code for _ in range(60)]
+            listing   = [auth_client.get("/api/booking/").status_code for _ in range(60)]
+        finally:
+            limiter.reset()
+        assert set(catalogue) == {200}
+        assert 429 in listing                    # the default limit is live
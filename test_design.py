@@ -0,0 +1,373 @@
+"""
+tests/test_design.py
+====================
+Integration tests for the Design Generation API.
+"""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+pytestmark = pytest.mark.usefixtures("clean_db")
+
+
+@pytest.fixture(scope="session")
+def jpeg_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), color=(180, 160, 140)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+def upload(client, jpeg_bytes, query_string=None, **form):
+    data = {"image": (io.BytesIO(jpeg_bytes), "room.jpg"), **form}
+    return client.post("/api/design/generate", data=data, query_string=query_string,
+                       content_type="multipart/form-data")
+
+
+def current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GENERATE
+# ─────────────────────────────────────────────────────────────────────────────
+class TestGenerate:
+    def test_upload_is_renamed_into_place_with_umask_mode(
+        self, auth_client, upload_dir, jpeg_bytes, monkeypatch
+    ):
+        from werkzeug.datastructures import FileStorage
+
+        def no_copy(*args, **kwargs):
+            raise AssertionError("upload was copied instead of renamed")
+        monkeypatch.setattr(FileStorage, "save", no_copy)
+
+        rv = upload(auth_client, jpeg_bytes)
+        assert rv.status_code == 201
+
+        stored = [p for p in upload_dir.iterdir()]
+        assert len(stored) == 1                      # no .upload-* spool left behind
+        assert not stored[0].name.startswith(".upload-")
+        assert stored[0].read_bytes() == jpeg_bytes
+        assert stored[0].stat().st_mode & 0o777 == 0o666 & ~current_umask()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESULT FORMAT
+# ─────────────────────────────────────────────────────────────────────────────
+class TestResultFormat:
+    def test_default_is_list_of_objects_everywhere(self, auth_client, upload_dir, jpeg_bytes):
+        created = upload(auth_client, jpeg_bytes).get_json()["data"]
+        furniture = created["ai_result"]["furniture"]
+        assert isinstance(furniture, list) and isinstance(furniture[0], dict)
+
+        fetched = auth_client.get(f"/api/design/projects/{created['project_id']}").get_json()["data"]
+        assert isinstance(fetched["ai_result"]["furniture"], list)
+        assert isinstance(fetched["ai_result"]["color_scheme"], list)
+
+    def test_soa_is_opt_in_and_consistent(self, auth_client, upload_dir, jpeg_bytes):
+        soa = {"format": "soa"}
+        created = upload(auth_client, jpeg_bytes, query_string=soa).get_json()["data"]
+        fetched = auth_client.get(
+            f"/api/design/projects/{created['project_id']}", query_string=soa
+        ).get_json()["data"]
+
+        for data in (created, fetched):
+            furniture = data["ai_result"]["furniture"]
+            assert isinstance(furniture, dict)
+            assert isinstance(furniture["name"], list)
+            assert isinstance(data["ai_result"]["color_scheme"], dict)
+        assert created["ai_result"]["furniture"] == fetched["ai_result"]["furniture"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LIST PROJECTS
+# ─────────────────────────────────────────────────────────────────────────────
+class TestListProjects:
+    @pytest.fixture
+    def project_ids(self, auth_client, upload_dir, jpeg_bytes):
+        ids = []
+        for _ in range(3):
+            rv = upload(auth_client, jpeg_bytes)
+            assert rv.status_code == 201
+            ids.append(rv.get_json()["data"]["project_id"])
+        return ids
+
+    def test_walk_pages_by_cursor(self, auth_client, project_ids):
+        seen, params = [], {"per_page": 2}
+        while True:
+            rv = auth_client.get("/api/design/projects", query_string=params)
+            assert rv.status_code == 200
+            data = rv.get_json()["data"]
+            seen += [item["id"] for item in data["items"]]
+            cursor = data["pagination"]["next_cursor"]
+            if cursor is None:
+                break
+            params = {"per_page": 2, "cursor": cursor}
+        assert seen == project_ids[::-1]
+
+    def test_offset_pages_keep_totals(self, auth_client, project_ids):
+        for page in (1, 2):
+            rv = auth_client.get("/api/design/projects", query_string={"page": page, "per_page": 2})
+            pagination = rv.get_json()["data"]["pagination"]
+            assert pagination["page"] == page
+            assert pagination["total"] == 3
+        assert pagination["has_next"] is False
+        assert pagination["next_cursor"] is None
+
+    def test_malformed_cursor_is_400(self, auth_client):
+        import base64
+        token = base64.urlsafe_b64encode(b"2026-13-45T00:00:00|1").decode()
+        rv = auth_client.get("/api/design/projects", query_string={"cursor": token})
+        assert rv.status_code == 400
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BULK DELETE
+# ─────────────────────────────────────────────────────────────────────────────
+class TestBulkDelete:
+    @staticmethod
+    def create(client, jpeg_bytes):
+        rv = upload(client, jpeg_bytes)
+        assert rv.status_code == 201
+        return rv.get_json()["data"]["project_id"]
+
+    @staticmethod
+    def bulk_delete(client, ids):
+        return client.delete("/api/design/projects", query_string={"ids": ",".join(map(str, ids))})
+
+    def test_deletes_own_projects_and_unlinks_files(self, auth_client, upload_dir, jpeg_bytes):
+        ids = [self.create(auth_client, jpeg_bytes) for _ in range(2)]
+        assert len(list(upload_dir.iterdir())) == 2
+
+        rv = self.bulk_delete(auth_client, ids)
+        assert rv.status_code == 200
+        assert rv.get_json()["data"]["deleted"] == 2
+        assert not list(upload_dir.iterdir())
+        for project_id in ids:
+            assert auth_client.get(f"/api/design/projects/{project_id}").status_code == 404
+
+    def test_foreign_ids_are_skipped(self, app, auth_client, upload_dir, jpeg_bytes):
+        other = app.test_client()
+        other.post("/api/auth/register", json={
+            "name": "Other User",
+            "email": "other@test.com",
+            "password": "Gruha@1234",
+        })
+        theirs = self.create(other, jpeg_bytes)
+        mine   = self.create(auth_client, jpeg_bytes)
+
+        rv = self.bulk_delete(auth_client, [mine, theirs])
+        assert rv.get_json()["data"]["deleted"] == 1
+        assert other.get(f"/api/design/projects/{theirs}").status_code == 200
+        assert len(list(upload_dir.iterdir())) == 1
+
+    def test_too_many_ids_is_400(self, auth_client):
+        from app.api.design import _BULK_DELETE_MAX
+        rv = self.bulk_delete(auth_client, range(1, _BULK_DELETE_MAX + 2))
+        assert rv.status_code == 400
+
+    def test_malformed_ids_is_400(self, auth_client):
+        assert self.bulk_delete(auth_client, ["1", "x"]).status_code == 400
+        assert auth_client.delete("/api/design/projects").status_code == 400
+
+    def test_linked_booking_is_unlinked_not_blocking(self, auth_client, upload_dir, jpeg_bytes):
+        project_id = self.create(auth_client, jpeg_bytes)
+        rv = auth_client.post("/api/booking/", json={
+            "furniture_id":      "SOF-MOD-001",
+            "delivery_address":  "12 MG Road, Bengaluru 560001",
+            "design_project_id": project_id,
+        })
+        assert rv.status_code == 201
+        booking_id = rv.get_json()["data"]["id"]
+
+        rv = self.bulk_delete(auth_client, [project_id])
+        assert rv.status_code == 200
+        assert rv.get_json()["data"]["deleted"] == 1
+
+        booking = auth_client.get(f"/api/booking/{booking_id}").get_json()["data"]
+        assert booking["design_project_id"] is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SIGNED IMAGE URLS
+# ─────────────────────────────────────────────────────────────────────────────
+class TestSignedImageUrl:
+    @pytest.fixture
+    def image_url(self, auth_client, upload_dir, jpeg_bytes):
+        rv = upload(auth_client, jpeg_bytes)
+        assert rv.status_code == 201
+        return rv.get_json()["data"]["image_url"]
+
+    @staticmethod
+    def split(url):
+        from urllib.parse import parse_qs, urlsplit
+        parts = urlsplit(url)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        return parts.path, query
+
+    def test_valid_signature(self, auth_client, image_url):
+        rv = auth_client.get(image_url)
+        assert rv.status_code == 200
+
+    def test_expired_signature(self, app, auth_client, image_url):
+        from app.utils.security import _image_signature
+        path, q = self.split(image_url)
+        filename = path.rsplit("/", 1)[1]
+        with app.app_context():
+            sig = _image_signature(filename, int(q["u"]), 1)
+        rv = auth_client.get(path, query_string={"u": q["u"], "e": 1, "s": sig})
+        assert rv.status_code == 404
+
+    def test_wrong_user(self, app, image_url):
+        other = app.test_client()
+        other.post("/api/auth/register", json={
+            "name": "Other User",
+            "email": "other@test.com",
+            "password": "Gruha@1234",
+        })
+        assert other.get(image_url).status_code == 404
+
+    def test_tampered_signature(self, auth_client, image_url):
+        path, q = self.split(image_url)
+        q["s"] = ("0" if q["s"][0] != "0" else "1") + q["s"][1:]
+        assert auth_client.get(path, query_string=q).status_code == 404
+
+    def test_non_ascii_signature_is_rejected_not_500(self, auth_client, image_url):
+        path, q = self.split(image_url)
+        q["s"] = "é"
+        assert auth_client.get(path, query_string=q).status_code == 404
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# AI QUOTA
+# ─────────────────────────────────────────────────────────────────────────────
+class TestAiQuota:
+    @staticmethod
+    def set_quota(user_id, used, limit):
+        from sqlalchemy import update
+        from app import db
+        from app.models.user import User
+        db.session.execute(
+            update(User).where(User.id == user_id)
+            .values(ai_analyses_used=used, ai_analyses_limit=limit)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def quota_used(user_id):
+        from sqlalchemy import select
+        from app import db
+        from app.models.user import User
+        return db.session.execute(
+            select(User.ai_analyses_used).where(User.id == user_id)
+        ).scalar_one()
+
+    def test_success_spends_one_unit(self, auth_client, upload_dir, jpeg_bytes):
+        self.set_quota(auth_client.user_id, 0, 5)
+        rv = upload(auth_client, jpeg_bytes)
+        assert rv.status_code == 201
+        assert rv.get_json()["data"]["quota_remaining"] == 4
+        assert self.quota_used(auth_client.user_id) == 1
+
+    def test_exhausted_quota_is_429(self, auth_client, upload_dir, jpeg_bytes):
+        self.set_quota(auth_client.user_id, 5, 5)
+        assert upload(auth_client, jpeg_bytes).status_code == 429
+        assert self.quota_used(auth_client.user_id) == 5
+
+    def test_overlapping_request_cannot_spend_last_unit(
+        self, app, auth_client, upload_dir, jpeg_bytes, monkeypatch
+    ):
+        """A second request arriving while the first holds the last unit gets 429."""
+        from app.api import design
+
+        self.set_quota(auth_client.user_id, 0, 1)
+        second = app.test_client()
+        second.post("/api/auth/login", json={"email": "owner@test.com", "password": "Gruha@1234"})
+
+        real_run = design._run_analysis
+        nested   = []
+
+        def run_with_overlap(project, dimensions):
+            if not nested:
+                nested.append(upload(second, jpeg_bytes).status_code)
+            return real_run(project, dimensions)
+        monkeypatch.setattr(design, "_run_analysis", run_with_overlap)
+
+        assert upload(auth_client, jpeg_bytes).status_code == 201
+        assert nested == [429]
+        assert self.quota_used(auth_client.user_id) == 1
+
+    def test_invalid_upload_is_rejected_before_quota(self, auth_client, upload_dir):
+        self.set_quota(auth_client.user_id, 5, 5)          # exhausted: 429 if reserved first
+        rv = auth_client.post("/api/design/generate", data={}, content_type="multipart/form-data")
+        assert rv.status_code == 400
+        assert self.quota_used(auth_client.user_id) == 5
+
+    def test_error_response_refunds(self, auth_client, upload_dir, jpeg_bytes, monkeypatch):
+        from app.api import design
+
+        def disk_full(file, path):
+            raise OSError("disk full")
+        monkeypatch.setattr(design, "persist_upload", disk_full)
+
+        self.set_quota(auth_client.user_id, 2, 5)
+        assert upload(auth_client, jpeg_bytes).status_code == 500
+        assert self.quota_used(auth_client.user_id) == 2
+
+    def test_raising_view_refunds(self, auth_client, upload_dir, jpeg_bytes, monkeypatch):
+        from app.api import design
+
+        def boom(records):
+            raise RuntimeError("serialisation failed")
+        monkeypatch.setattr(design, "records_to_columns", boom)
+
+        self.set_quota(auth_client.user_id, 2, 5)
+        with pytest.raises(RuntimeError):
+            upload(auth_client, jpeg_bytes, query_string={"format": "soa"})
+        assert self.quota_used(auth_client.user_id) == 2
+
+    def test_refund_handles_null_usage(self, auth_client, upload_dir, jpeg_bytes, monkeypatch):
+        from app.api import design
+
+        def disk_full(file, path):
+            raise OSError("disk full")
+        monkeypatch.setattr(design, "persist_upload", disk_full)
+
+        self.set_quota(auth_client.user_id, None, 5)
+        assert upload(auth_client, jpeg_bytes).status_code == 500
+        assert self.quota_used(auth_client.user_id) == 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BACKGROUND ANALYSIS
+# ─────────────────────────────────────────────────────────────────────────────
+class TestBackgroundAnalysis:
+    def test_generate_answers_202_then_completes(
+        self, app, auth_client, upload_dir, jpeg_bytes, monkeypatch
+    ):
+        import time
+
+        monkeypatch.setitem(app.config, "AI_BACKGROUND_ANALYSIS", True)
+        rv = upload(auth_client, jpeg_bytes, style="Bohemian")
+        assert rv.status_code == 202
+        data = rv.get_json()["data"]
+        assert data["status"] == "processing"
+        assert data["quota_remaining"] >= 0
+
+        deadline = time.monotonic() + 10
+        while True:
+            project = auth_client.get(f"/api/design/projects/{data['project_id']}").get_json()["data"]
+            if project["status"] != "processing" or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        assert project["status"] == "completed"
@@ -0,0 +1,114 @@
+"""
+tests/test_security.py
+======================
+Unit tests for upload validation helpers in app.utils.security.
+"""
+
+import io
+
+import pytest
+
+PNG  = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+WEBP = b"RIFF\x24\x00\x00\x00WEBPVP8 "
+HEIC = b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00"
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MAGIC-BYTE SNIFFING
+# ─────────────────────────────────────────────────────────────────────────────
+class TestDetectMime:
+    @pytest.mark.parametrize("header, mime", [
+        (PNG,  "image/png"),
+        (WEBP, "image/webp"),
+        (HEIC, "image/heic"),
+        (b"\x00\x00\x00\x1cftypmif1", "image/heic"),
+        (JPEG, "image/jpeg"),
+        (b"\xff\xd8\xff\xdb\x00\x43", "image/jpeg"),   # JPEG starting with DQT
+    ])
+    def test_accepts_known_images(self, header, mime):
+        from app.utils.security import _detect_mime
+        assert _detect_mime(header) == mime
+
+    @pytest.mark.parametrize("header", [
+        b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00",  # NUL-prefixed MP4, not HEIC
+        b"\x00" * 12,
+        b"GIF89a\x01\x00\x01\x00\x00\x00",
+        b"RIFF\x24\x00\x00\x00WAVEfmt ",               # RIFF but not WEBP
+        b"\x89PNG\x00\x00\x00\x00\x00\x00\x00\x00",   # PNG prefix, wrong tail
+        b"%PDF-1.7\n%\xe2\xe3",
+        b"",
+    ])
+    def test_rejects_unknown_headers(self, header):
+        from app.utils.security import _detect_mime
+        assert _detect_mime(header) is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FULL FILE VALIDATION
+# ─────────────────────────────────────────────────────────────────────────────
+class TestValidateImageFile:
+    @staticmethod
+    def validate(app, content, filename):
+        from werkzeug.datastructures import FileStorage
+        from app.utils.security import validate_image_file
+        with app.app_context():
+            return validate_image_file(FileStorage(io.BytesIO(content), filename=filename))
+
+    @pytest.mark.parametrize("content, filename", [
+        (PNG,  "room.png"),
+        (WEBP, "room.webp"),
+        (HEIC, "room.heic"),
+        (JPEG, "room.jpg"),
+        (JPEG, "room.jpeg"),
+    ])
+    def test_accepts_matching_content(self, app, content, filename):
+        assert self.validate(app, content, filename) == (True, "")
+
+    def test_rejects_unrecognised_content(self, app):
+        ok, message = self.validate(app, b"\x00\x00\x00\x18ftypisom" + b"\x00" * 16, "room.heic")
+        assert not ok
+        assert "not a recognised image" in message
+
+    def test_rejects_extension_mismatch(self, app):
+        ok, message = self.validate(app, PNG, "room.jpg")
+        assert not ok
+        assert "does not match" in message
+
+    def test_rejects_empty_file(self, app):
+        assert self.validate(app, b"", "room.png") == (False, "File is empty.")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON BODY PARSING
+# ─────────────────────────────────────────────────────────────────────────────
+class TestGetJsonBody:
+    @staticmethod
+    def parse(app, body, **required):
+        """Parse `body` as a chunked request: no Content-Length header at all."""
+        from app.utils.security import get_json_body
+        with app.test_request_context(
+            "/", method="POST", content_type="application/json",
+            input_stream=io.BytesIO(body),
+            environ_overrides={"wsgi.input_terminated": True},
+        ):
+            return get_json_body(**required)
+
+    def test_parses_headerless_body(self, app):
+        data, err = self.parse(app, b'{"email": "a@b.co"}', email=str)
+        assert err is None
+        assert data == {"email": "a@b.co"}
+
+    def test_caps_bytes_read_without_content_length(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, "MAX_JSON_BODY", 1024)
+        body = b'{"notes": "' + b"x" * 2048 + b'"}'
+        data, err = self.parse(app, body)
+        assert data is None
+        assert "too large" in err
+
+    def test_body_at_limit_is_accepted(self, app, monkeypatch):
+        body = b'{"notes": "' + b"x" * 100 + b'"}'
+        monkeypatch.setitem(app.config, "MAX_JSON_BODY", len(body))
+        data, err = self.parse(app, body)
+        assert err is None
+        assert len(data["notes"]) == 100
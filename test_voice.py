@@ -0,0 +1,139 @@
+"""
+tests/test_voice.py
+===================
+Integration tests for the Voice Assistant API audio paths.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.usefixtures("clean_db")
+
+
+@pytest.fixture
+def audio_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "AUDIO_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def slow_tts(monkeypatch):
+    """Replace TTSEngine.render with one that blocks until released."""
+    from ai_engine import TTSEngine
+
+    release = threading.Event()
+    state   = {"ext": ".mp3", "calls": 0}
+
+    def fake_render(self, text, language="en", cache_dir="/tmp"):
+        state["calls"] += 1
+        release.wait(timeout=10)
+        path = os.path.join(cache_dir, self.cache_key(text, language) + state["ext"])
+        with open(path, "w") as fh:
+            fh.write(text)
+        return path
+
+    monkeypatch.setattr(TTSEngine, "render", fake_render)
+    state["release"] = release
+    return state
+
+
+def ask(client):
+    rv = client.post("/api/voice/ask", json={"query": "How do I light a small room?"})
+    assert rv.status_code == 200
+    return rv.get_json()["data"]
+
+
+def wait_for_audio(client, url, timeout=5):
+    """Follow 202 + Retry-After (without the full delay) until the audio is ready."""
+    deadline = time.monotonic() + timeout
+    while True:
+        rv = client.get(url)
+        if rv.status_code != 202 or time.monotonic() > deadline:
+            return rv
+        time.sleep(0.05)
+
+
+class TestBackgroundAudio:
+    @pytest.fixture(autouse=True)
+    def background(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, "TTS_BACKGROUND", True)
+
+    def test_pending_audio_is_202_then_served(self, auth_client, audio_dir, slow_tts):
+        data = ask(auth_client)
+        assert data["audio_pending"] is True
+        assert data["audio_filename"].endswith(".mp3")
+
+        rv = auth_client.get(data["audio_url"])
+        assert rv.status_code == 202
+        assert rv.headers["Retry-After"] == "1"
+        assert "immutable" not in rv.headers["Cache-Control"]
+
+        slow_tts["release"].set()
+        rv = wait_for_audio(auth_client, data["audio_url"])
+        assert rv.status_code == 200
+        assert "immutable" in rv.headers["Cache-Control"]
+        assert not list(audio_dir.glob("*.pending"))
+
+    def test_other_worker_sees_marker(self, auth_client, audio_dir, slow_tts, monkeypatch):
+        from app.api import voice
+
+        data = ask(auth_client)
+        # A different worker has no future for this render, only the marker
+        monkeypatch.setattr(voice, "_inflight", {})
+        assert (audio_dir / (data["audio_filename"][:-4] + ".pending")).exists()
+        assert auth_client.get(data["audio_url"]).status_code == 202
+
+        slow_tts["release"].set()
+        assert wait_for_audio(auth_client, data["audio_url"]).status_code == 200
+
+    def test_pending_request_does_not_block(self, auth_client, audio_dir, slow_tts):
+        data = ask(auth_client)
+        start = time.monotonic()
+        assert auth_client.get(data["audio_url"]).status_code == 202
+        assert time.monotonic() - start < 1
+        slow_tts["release"].set()
+
+    def test_identical_answers_share_one_render(self, auth_client, audio_dir, slow_tts):
+        first, second = ask(auth_client), ask(auth_client)
+        assert first["audio_filename"] == second["audio_filename"]
+        slow_tts["release"].set()
+        assert wait_for_audio(auth_client, first["audio_url"]).status_code == 200
+        assert slow_tts["calls"] == 1
+
+    def test_one_file_per_answer(self, auth_client, audio_dir, slow_tts):
+        """The route's file is TTSEngine's content-addressed render, not a second copy."""
+        slow_tts["release"].set()
+        data = ask(auth_client)
+        assert wait_for_audio(auth_client, data["audio_url"]).status_code == 200
+        assert sorted(p.name for p in audio_dir.iterdir()) == [data["audio_filename"]]
+
+    def test_placeholder_served_under_mp3_url(self, auth_client, audio_dir, slow_tts):
+        slow_tts["ext"] = ".txt"
+        slow_tts["release"].set()
+        data = ask(auth_client)
+
+        deadline = time.monotonic() + 5
+        while list(audio_dir.glob("*.pending")) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        rv = auth_client.get(data["audio_url"])
+        assert rv.status_code == 200
+        assert "immutable" not in rv.headers["Cache-Control"]
+
+
+class TestServeAudio:
+    def test_missing_file_is_404(self, auth_client, audio_dir):
+        rv = auth_client.get("/api/voice/audio/" + "0" * 32 + ".mp3")
+        assert rv.status_code == 404
+        assert "Cache-Control" not in rv.headers or "immutable" not in rv.headers["Cache-Control"]
+
+    def test_disallowed_extension_is_403(self, auth_client, audio_dir):
+        rv = auth_client.get("/api/voice/audio/notes.pending")
+        assert rv.status_code == 403
+
+    def test_requires_login(self, client, audio_dir):
+        rv = client.get("/api/voice/audio/x.mp3")
+        assert rv.status_code == 401
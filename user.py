@@ -4,12 +4,49 @@ app/models/user.py
 User model – authentication, session management, profile.
 """
 
-from datetime import datetime, timezone
+import os
+import secrets
+from functools import lru_cache
+
+from flask import current_app, has_app_context
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
 
+DEFAULT_PASSWORD_METHOD   = "scrypt:32768:8:1"
+DEFAULT_PBKDF2_ITERATIONS = 260_000
+
+# SQLA_STRICT=1 (dev/test): collection relationships raise instead of querying
+_COLLECTION_LAZY = "raise_on_sql" if os.getenv("SQLA_STRICT") == "1" else "dynamic"
+
+
+def _password_hash_method() -> str:
+    """Resolve the configured Werkzeug hashing method to its full form."""
+    if not has_app_context():
+        return DEFAULT_PASSWORD_METHOD
+    method = current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_PASSWORD_METHOD)
+    if method == "pbkdf2":
+        iterations = current_app.config.get("PASSWORD_HASH_ITERATIONS", DEFAULT_PBKDF2_ITERATIONS)
+        method = f"pbkdf2:sha256:{iterations}"
+    return method
+
+
+@lru_cache(maxsize=4)
+def _dummy_password_hash(method: str) -> str:
+    """A throwaway hash per method, built once and reused."""
+    return generate_password_hash(secrets.token_urlsafe(16), method=method, salt_length=16)
+
+
+def dummy_password_check(raw_password: str) -> bool:
+    """
+    Spend the same hashing work as User.check_password() when no account
+    matched, so login timing does not reveal which emails are registered.
+    Always returns False.
+    """
+    check_password_hash(_dummy_password_hash(_password_hash_method()), raw_password)
+    return False
+
 
 class User(UserMixin, db.Model):
     """
@@ -37,18 +74,38 @@ class User(UserMixin, db.Model):
     ai_analyses_limit = db.Column(db.Integer, default=5)
 
     # ── Timestamps ────────────────────────────────────────────────────────────
-    created_at     = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at     = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
-                                onupdate=lambda: datetime.now(timezone.utc))
+    # Filled by the database clock; eager_defaults (below) fetches them back
+    # via RETURNING so to_dict() after an insert doesn't trigger a reload.
+    created_at     = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    updated_at     = db.Column(db.DateTime(timezone=True), server_default=db.func.now(),
+                                onupdate=db.func.now(), nullable=False)
     last_login_at  = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    # ── Indexes ───────────────────────────────────────────────────────────────
+    # `email` (unique, indexed) serves the login/register equality lookups;
+    # this adds case-insensitive uniqueness matching sanitise_email().
+    # users_quota_avail_idx only holds users with analyses left, for
+    # with_remaining_quota() (predicate must match that query's WHERE).
+    __table_args__ = (
+        db.Index("users_email_ci_idx", db.func.lower(email), unique=True),
+        db.Index(
+            "users_quota_avail_idx", id,
+            postgresql_where=ai_analyses_used < ai_analyses_limit,
+            sqlite_where=ai_analyses_used < ai_analyses_limit,
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
     # ── Relationships ─────────────────────────────────────────────────────────
+    # Request paths query projects/bookings directly (keyset/paginate helpers)
+    # and never go through these collections; SQLA_STRICT=1 makes any
+    # implicit load raise so the suite can prove that.
     design_projects = db.relationship(
-        "DesignProject", backref="owner", lazy="dynamic",
+        "DesignProject", backref="owner", lazy=_COLLECTION_LAZY,
         cascade="all, delete-orphan"
     )
     bookings = db.relationship(
-        "FurnitureBooking", backref="customer", lazy="dynamic",
+        "FurnitureBooking", backref="customer", lazy=_COLLECTION_LAZY,
         cascade="all, delete-orphan"
     )
 
@@ -59,10 +116,13 @@ class User(UserMixin, db.Model):
 
     @password.setter
     def password(self, raw_password: str) -> None:
-        """Hash and store password using Werkzeug's PBKDF2-HMAC-SHA256."""
+        """
+        Hash and store password with the method from PASSWORD_HASH_METHOD
+        (scrypt by default; "pbkdf2" uses PASSWORD_HASH_ITERATIONS).
+        """
         self._password_hash = generate_password_hash(
             raw_password,
-            method="pbkdf2:sha256:260000",  # 260k iterations
+            method=_password_hash_method(),
             salt_length=16,
         )
 
@@ -70,6 +130,10 @@ class User(UserMixin, db.Model):
         """Verify a plaintext password against the stored hash."""
         return check_password_hash(self._password_hash, raw_password)
 
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash was made with a different method or cost."""
+        return not self._password_hash.startswith(_password_hash_method() + "$")
+
     # ── AI quota helpers ──────────────────────────────────────────────────────
     @property
     def has_ai_quota(self) -> bool:
@@ -80,6 +144,11 @@ class User(UserMixin, db.Model):
         """Increment usage counter."""
         self.ai_analyses_used = (self.ai_analyses_used or 0) + 1
 
+    @classmethod
+    def with_remaining_quota(cls):
+        """SELECT for users who can still run an analysis (SQL-side has_ai_quota)."""
+        return db.select(cls).where(cls.ai_analyses_used < cls.ai_analyses_limit)
+
     # ── Serialisation ─────────────────────────────────────────────────────────
     def to_dict(self, include_private: bool = False) -> dict:
         """Convert model to dictionary for JSON responses."""
@@ -9,10 +9,18 @@ Routes:
   GET  /api/voice/languages    – List supported languages
 """
 
+import mimetypes
 import os
+import threading
+import time
+from concurrent.futures import Future
+from types import MappingProxyType
 
 from flask import Blueprint, request, current_app, send_from_directory
 from flask_login import current_user
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
 
 from app import limiter
 from app.utils.security import (
@@ -22,6 +30,109 @@ from app.utils.security import (
 
 voice_bp = Blueprint("voice", __name__)
 
+# Audio files still being rendered on this process's TTS pool, keyed by
+# filename. Each render also leaves a "<key>.pending" marker in AUDIO_FOLDER
+# so serve_audio() in any worker can tell a render in progress from a
+# missing file.
+_AUDIO_WAIT_S   = 30          # marker older than this = render died; inline render timeout
+_AUDIO_RETRY_S  = 1           # Retry-After sent while a render is pending
+_PENDING_SUFFIX = ".pending"
+_inflight: dict[str, Future] = {}
+_inflight_lock  = threading.Lock()
+
+_ALLOWED_AUDIO_EXTS = frozenset({".mp3", ".wav", ".ogg", ".txt"})
+_AUDIO_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# .txt is the gTTS-unavailable placeholder; a later render may replace it
+_PLACEHOLDER_CACHE_CONTROL = "private, no-cache"
+
+# Used when the app config does not define SUPPORTED_LANGUAGES
+_DEFAULT_LANGUAGES = MappingProxyType({
+    "english": "en", "hindi": "hi", "telugu": "te",
+    "en": "en", "hi": "hi", "te": "te",
+})
+
+
+def _forget_inflight(filename: str, marker: str):
+    """Return a done-callback that drops *filename* from the in-flight map."""
+    def _done(_future: Future) -> None:
+        with _inflight_lock:
+            _inflight.pop(filename, None)
+        try:
+            os.remove(marker)
+        except FileNotFoundError:
+            pass
+    return _done
+
+
+def _synthesize_shared(text: str, lang_code: str, audio_dir: str, key: str) -> Future:
+    """
+    Start rendering *text* into ``<key>.mp3`` (TTSEngine's content-addressed
+    store, with AUDIO_FOLDER as its directory), or join the render already in
+    flight for the same file, so a burst of identical answers costs one gTTS
+    call.
+
+    Returns:
+        Future resolving to the saved file path.
+    """
+    from ai_engine import get_tts_engine
+
+    filename = f"{key}.mp3"
+    marker   = os.path.join(audio_dir, key + _PENDING_SUFFIX)
+    with _inflight_lock:
+        future = _inflight.get(filename)
+        if future is not None:
+            return future
+        open(marker, "w").close()
+        future = get_tts_engine().render_async(
+            text      = text,
+            language  = lang_code,
+            cache_dir = audio_dir,
+        )
+        _inflight[filename] = future
+    # Outside the lock: the callback runs inline if the future already finished.
+    future.add_done_callback(_forget_inflight(filename, marker))
+    return future
+
+
+def _resolve_audio(audio_dir: str, filename: str) -> tuple[str | None, bool]:
+    """
+    Find the file to serve for *filename* without waiting for it.
+
+    Falls back to the ``.txt`` placeholder TTSEngine writes when gTTS is not
+    installed.
+
+    Returns:
+        (name, False) when a file exists, (None, True) while a fresh
+        ``.pending`` marker shows a render running in some worker, and
+        (None, False) when there is nothing to serve.
+    """
+    stem   = os.path.splitext(filename)[0]
+    marker = safe_join(audio_dir, stem + _PENDING_SUFFIX)
+    if marker is None:
+        return None, False
+    # Marker first: if it is gone, the render finished before the file check
+    try:
+        pending = time.time() - os.path.getmtime(marker) < _AUDIO_WAIT_S
+    except FileNotFoundError:
+        pending = False
+    for name in dict.fromkeys((filename, stem + ".txt")):
+        path = safe_join(audio_dir, name)
+        if path is not None and os.path.isfile(path):
+            return name, False
+    return None, pending
+
+
+def _audio_pending():
+    """202 telling the client to retry the same audio URL shortly."""
+    response, status = api_success(
+        data={"audio_pending": True, "retry_after": _AUDIO_RETRY_S},
+        message="Audio is still being generated.",
+        status_code=202,
+    )
+    response.headers["Retry-After"] = str(_AUDIO_RETRY_S)
+    response.headers["Cache-Control"] = "no-store"
+    return response, status
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ASK THE VOICE ASSISTANT
@@ -45,7 +156,10 @@ def ask_voice():
           "answer":    "...",
           "language":  "en",
           "audio_url": "/api/voice/audio/<filename.mp3>",
-          "audio_filename": "filename.mp3"
+          "audio_filename": "filename.mp3",
+          "audio_pending":  true   – audio is still rendering (TTS_BACKGROUND);
+                                     GET audio_url answers 202 + Retry-After
+                                     until it is ready
         }
     """
     data, err = get_json_body(query="str")
@@ -53,18 +167,16 @@ def ask_voice():
         return api_error(err, 400)
 
     raw_query   = sanitise_text(data["query"], 500)
-    language    = data.get("language", "english").lower().strip()
+    language    = data.get("language", "english")
     want_audio  = bool(data.get("voice_response", True))
 
     if not raw_query:
         return api_error("Query cannot be empty.", 400)
 
-    # Resolve language code
-    supported = current_app.config.get("SUPPORTED_LANGUAGES", {
-        "english": "en", "hindi": "hi", "telugu": "te",
-        "en": "en", "hi": "hi", "te": "te",
-    })
-    lang_code = supported.get(language, "en")
+    # Resolve language code; clients almost always send a canonical key, so
+    # only normalise case/whitespace when the exact lookup misses.
+    supported = current_app.config.get("SUPPORTED_LANGUAGES") or _DEFAULT_LANGUAGES
+    lang_code = supported.get(language) or supported.get(language.lower().strip(), "en")
 
     # ── 1. Get text answer from LangChain agent ───────────────────────────────
     try:
@@ -79,20 +191,30 @@ def ask_voice():
     # ── 2. Generate audio with gTTS ───────────────────────────────────────────
     audio_url      = None
     audio_filename = None
+    audio_pending  = False
 
     if want_audio:
         try:
-            from ai_engine import get_tts_engine
             audio_dir = current_app.config["AUDIO_FOLDER"]
             os.makedirs(audio_dir, exist_ok=True)
 
-            tts      = get_tts_engine()
-            out_path = tts.synthesize(
-                text       = answer,
-                language   = lang_code,
-                output_dir = audio_dir,
-            )
-            audio_filename = os.path.basename(out_path)
+            # Content-addressed: AUDIO_FOLDER is TTSEngine's render store, so
+            # the same answer in the same language always maps to the same
+            # file and repeats cost a stat() instead of a gTTS round-trip.
+            from ai_engine import get_tts_engine
+            key            = get_tts_engine().cache_key(answer, lang_code)
+            audio_filename = f"{key}.mp3"
+            out_path       = os.path.join(audio_dir, audio_filename)
+
+            if os.path.exists(out_path):
+                pass  # cache hit
+            elif current_app.config.get("TTS_BACKGROUND"):
+                _synthesize_shared(answer, lang_code, audio_dir, key)
+                audio_pending = True
+            else:
+                future         = _synthesize_shared(answer, lang_code, audio_dir, key)
+                audio_filename = os.path.basename(future.result(timeout=_AUDIO_WAIT_S))
+
             audio_url      = f"/api/voice/audio/{audio_filename}"
 
             current_app.logger.info(
@@ -102,7 +224,8 @@ def ask_voice():
         except Exception as e:
             current_app.logger.error("TTS generation error: %s", e, exc_info=True)
             # Non-fatal: return text answer even if audio fails
-            audio_url = None
+            audio_url     = None
+            audio_pending = False
 
     return api_success(
         data={
@@ -112,6 +235,7 @@ def ask_voice():
             "audio_url":      audio_url,
             "audio_filename": audio_filename,
             "audio_available": audio_url is not None,
+            "audio_pending":   audio_pending,
         },
         message="Voice assistant response ready.",
     )
@@ -126,21 +250,62 @@ def serve_audio(filename: str):
     """
     Stream a generated gTTS audio file.
 
+    If /ask handed out the URL before synthesis completed (TTS_BACKGROUND),
+    this answers 202 with Retry-After until the file exists, rather than
+    holding the worker while it renders.
+
     Only the authenticated user's session can access audio files.
-    Files are UUID-named so they are not guessable, but we still
+    Files are named by a hash of their (language, text) content, so we
     require authentication for defence-in-depth.
     """
     audio_dir = current_app.config["AUDIO_FOLDER"]
 
-    if not os.path.isfile(os.path.join(audio_dir, filename)):
+    # Guard: only allow audio/placeholder files served here
+    if os.path.splitext(filename)[1].lower() not in _ALLOWED_AUDIO_EXTS:
+        return api_error("File type not permitted.", 403)
+
+    # Never block the worker on a render: a pending one answers 202 at once
+    future = _inflight.get(filename)
+    if future is not None:
+        if not future.done():
+            return _audio_pending()
+        if future.exception() is not None:
+            current_app.logger.error("TTS generation error: %s", future.exception())
+            return api_error("Audio generation failed.", 503)
+
+    # The render may belong to another worker, or may have fallen back to a
+    # .txt placeholder; serve whatever was actually written.
+    resolved, pending = _resolve_audio(audio_dir, filename)
+    if pending:
+        return _audio_pending()
+    if resolved is None:
         return api_error("Audio file not found.", 404)
+    filename = resolved
 
-    # Guard: only allow mp3/txt files served here
-    allowed_exts = {".mp3", ".wav", ".ogg", ".txt"}
-    if not any(filename.lower().endswith(ext) for ext in allowed_exts):
-        return api_error("File type not permitted.", 403)
+    accel_prefix = current_app.config.get("AUDIO_ACCEL_REDIRECT_PREFIX")
+    if accel_prefix:
+        # nginx streams the file (sendfile) from an internal location; the
+        # worker is released as soon as these headers are written.
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        )
+        response.headers["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + secure_filename(filename)
+    else:
+        # send_from_directory stats the file itself; a separate isfile() would
+        # just repeat it. conditional=True answers Range/If-None-Match cheaply,
+        # and the body goes out through the server's wsgi.file_wrapper
+        # (sendfile under gunicorn) rather than being read into Python.
+        try:
+            response = send_from_directory(audio_dir, filename, conditional=True, etag=True)
+        except NotFound:
+            return api_error("Audio file not found.", 404)
 
-    return send_from_directory(audio_dir, filename)
+    # Names are content hashes, so the bytes behind a real audio URL never change
+    if filename.endswith(".txt"):
+        response.headers["Cache-Control"] = _PLACEHOLDER_CACHE_CONTROL
+    else:
+        response.headers["Cache-Control"] = _AUDIO_CACHE_CONTROL
+    return response
 
 
 # ─────────────────────────────────────────────────────────────────────────────